@@ -1,7 +1,16 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
 from app.core.security import verify_api_key
+from app.repositories.polymer_repository import AsyncPolymerRepository
+from app.services.reaction_rules import ReactionRules, get_rules
 
 security = HTTPBearer()
 
@@ -18,4 +27,37 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,  # Changed from 401 to 403
             detail="Could not validate credentials"
-        )
\ No newline at end of file
+        )
+
+async def get_polymer_repository(db: Session = Depends(get_db)) -> AsyncPolymerRepository:
+    """
+    Repository on the regular session; queries run in worker threads
+    """
+    return AsyncPolymerRepository(db)
+
+async def get_async_polymer_repository(db: AsyncSession = Depends(get_async_db)) -> AsyncPolymerRepository:
+    """
+    Repository on the asyncio session
+    """
+    return AsyncPolymerRepository(db)
+
+# Routes use whichever database path is configured
+repository_dependency = (
+    get_async_polymer_repository if settings.async_database else get_polymer_repository
+)
+
+async def get_reaction_rules(
+    rules: Optional[str] = Query(
+        None, description="Reaction rule set, e.g. polarity;inert=xX (defaults to the server's)"
+    )
+) -> ReactionRules:
+    """
+    Compiled reaction rules for the request
+    """
+    try:
+        return get_rules(rules or settings.reaction_rules)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
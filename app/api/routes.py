@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from datetime import datetime, timedelta
 from typing import List
 from typing import List, Optional
-from sqlalchemy import func
-from app.repositories.polymer_repository import PolymerRepository
 
-from app.core.database import get_db
 from app.models.schemas import (
-    PolymerCreate, PolymerResponse, PolymerList, ReactionResult, ErrorResponse
+    PolymerCreate, PolymerResponse, PolymerList, ReactionResult, ErrorResponse,
+    IngestChunk, IngestSummary, ReactionStats, ReactorBatchRequest, ReactorBatchResult
 )
-from app.repositories.polymer_repository import PolymerRepository
-from app.services.polymer_service import process_multiple_polymers
-from app.api.dependencies import get_current_user
+from app.repositories.polymer_repository import AsyncPolymerRepository
+from app.repositories.reactor_index import react_windows, reactor_index
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import naive_timestamp, slow_query_log
+from app.services.polymer_service import (
+    ReactionCounter, ReactionState, react_records, react_sliding_windows, record_segment
+)
+from app.services.reaction_rules import ReactionRules
+from app.services.result_cache import make_key, result_cache
+from app.api.dependencies import get_current_user, get_reaction_rules, repository_dependency
+from app.utils.cursors import decode_cursor, encode_cursor
+from app.utils.serialization import encode_polymer_list
 
 router = APIRouter()
 
@@ -27,14 +37,13 @@ router = APIRouter()
         503: {"description": "Service is unhealthy"}
     }
 )
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(repository: AsyncPolymerRepository = Depends(repository_dependency)):
     """
     Health check endpoint to verify API and database connectivity
     """
     try:
-        # Test database connection - SQLAlchemy 2.0 syntax
-        from sqlalchemy import text
-        db.execute(text("SELECT 1"))
+        # Test database connection
+        await repository.ping()
         return {
             "status": "healthy",
             "timestamp": datetime.utcnow().isoformat(),
@@ -46,6 +55,20 @@ async def health_check(db: Session = Depends(get_db)):
             detail=f"Service unhealthy: {str(e)}"
         )
 
+@router.get(
+    "/metrics",
+    response_class=Response,
+    responses={
+        200: {"description": "Metrics in Prometheus text format"}
+    }
+)
+async def get_metrics():
+    """
+    Request latency, per-stage latency, rows fetched, monomers reacted and
+    response sizes, per endpoint, in Prometheus text format
+    """
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 # ===== AUTHENTICATED ENDPOINTS =====
 
 @router.post(
@@ -60,7 +83,7 @@ async def health_check(db: Session = Depends(get_db)):
 )
 async def ingest_polymers(
     polymers: List[PolymerCreate],
-    db: Session = Depends(get_db),
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -69,26 +92,110 @@ async def ingest_polymers(
     - Each polymer must be 1-128 characters long
     - Each polymer must contain only letters
     - Timestamps must be unique
+    - The batch is stored all-or-nothing
     """
-    repository = PolymerRepository(db)
-    created_polymers = []
+    try:
+        return await repository.create_many(polymers)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to create polymer record: {str(e)}"
+        )
+
+# A single NDJSON record is a timestamp and at most 128 letters
+MAX_NDJSON_LINE_BYTES = 4096
+
+@router.post(
+    "/polymers/ndjson",
+    status_code=status.HTTP_201_CREATED,
+    response_model=IngestSummary,
+    responses={
+        401: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+        415: {"model": ErrorResponse},
+        422: {"model": ErrorResponse}
+    }
+)
+async def ingest_polymers_ndjson(
+    request: Request,
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Ingest polymer records streamed as newline-delimited JSON.
+    
+    - Send one polymer object per line with Content-Type application/x-ndjson
+    - Lines are validated as they arrive and stored in chunks
+    - Chunks stored before a failing line stay stored; the error says how
+      many records were ingested so the upload can resume from there
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type != "application/x-ndjson":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Type must be application/x-ndjson"
+        )
+    
+    chunks: List[IngestChunk] = []
+    pending: List[PolymerCreate] = []
+    ingested = 0
+    line_number = 0
     
-    for polymer_data in polymers:
+    async def flush():
+        nonlocal ingested
         try:
-            polymer_record = repository.create(polymer_data)
-            created_polymers.append(polymer_record)
+            records = await repository.create_many(pending)
         except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
-                detail=str(e)
+                detail=f"{e} (before line {line_number}; {ingested} records ingested)"
             )
-        except Exception as e:
+        ingested += len(records)
+        chunks.append(IngestChunk(
+            chunk=len(chunks) + 1,
+            ingested=len(records),
+            first_timestamp=records[0].timestamp,
+            last_timestamp=records[-1].timestamp
+        ))
+        pending.clear()
+    
+    async def parse(line: bytes):
+        nonlocal line_number
+        line_number += 1
+        if not line.strip():
+            return
+        try:
+            pending.append(PolymerCreate.model_validate_json(line))
+        except ValidationError as e:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to create polymer record: {str(e)}"
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Line {line_number}: {e.errors()[0]['msg']} ({ingested} records ingested)"
+            )
+        if len(pending) >= settings.ingest_chunk_size:
+            await flush()
+    
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            await parse(line)
+        if len(buffer) > MAX_NDJSON_LINE_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Line {line_number + 1}: line too long ({ingested} records ingested)"
             )
     
-    return created_polymers
+    await parse(buffer)
+    if pending:
+        await flush()
+    
+    return IngestSummary(ingested=ingested, chunks=chunks)
 
 @router.get(
     "/polymers",
@@ -104,8 +211,12 @@ async def get_polymers(
     length_gt: Optional[int] = Query(None, description="Filter polymers longer than"),
     length_lt: Optional[int] = Query(None, description="Filter polymers shorter than"),
     substring: Optional[str] = Query(None, description="Filter polymers containing substring"),
-    case_sensitive: bool = Query(True, description="Case-sensitive substring matching"),
-    db: Session = Depends(get_db),
+    case_sensitive: bool = Query(False, description="Case-sensitive substring matching"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=settings.max_page_size, description="Maximum records per page"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -114,6 +225,7 @@ async def get_polymers(
     - Results are ordered by timestamp
     - Both start and end parameters are required
     - Optional filters: length_gt, length_lt, substring
+    - With limit, pass the returned next_cursor to fetch the following page
     """
     if start > end:
         raise HTTPException(
@@ -128,12 +240,76 @@ async def get_polymers(
             detail="length_gt must be less than length_lt"
         )
     
-    repository = PolymerRepository(db)
-    polymers = repository.get_by_time_range_with_filters(
-        start, end, length_gt, length_lt, substring, case_sensitive
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    cache_key = make_key(
+        "polymers", start, end, length_gt=length_gt, length_lt=length_lt,
+        substring=substring, case_sensitive=case_sensitive, limit=limit, cursor=cursor
+    )
+    if result_cache.enabled:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+    
+    generation = result_cache.generation
+    
+    # Fetch one extra record to learn whether another page follows
+    polymers = await repository.get_rows_by_time_range_with_filters(
+        start, end, length_gt, length_lt, substring, case_sensitive,
+        limit=limit + 1 if limit is not None else None,
+        after=after
     )
     
-    return PolymerList(polymers=[p for p in polymers])
+    next_cursor = None
+    if limit is not None and len(polymers) > limit:
+        polymers = polymers[:limit]
+        next_cursor = encode_cursor(polymers[-1].timestamp, polymers[-1].id)
+    
+    # Rows are encoded directly instead of validating a PolymerList twice
+    with metrics.stage("serialize"):
+        content = encode_polymer_list(polymers, next_cursor)
+    
+    if result_cache.enabled:
+        result_cache.put(cache_key, start, end, content, size=len(content), generation=generation)
+    
+    return Response(content=content, media_type="application/json")
+
+async def load_reactor_index(repository: AsyncPolymerRepository) -> None:
+    """
+    Build the reactor index on first use, reading the records through the
+    repository and reducing them in a worker thread.
+    """
+    if not reactor_index.loaded:
+        reactor_index.begin_load()
+        records = await repository.get_all_polymers()
+        await run_in_threadpool(reactor_index.load, records)
+
+async def react_range(
+    repository: AsyncPolymerRepository, start: datetime, end: datetime, rules: ReactionRules
+) -> tuple[str, int]:
+    """
+    React every polymer in [start, end], from the index when it is enabled.
+    """
+    # The index holds segments reduced with the polarity rules
+    if settings.reactor_index_enabled and rules.canonical:
+        await load_reactor_index(repository)
+        return await run_in_threadpool(reactor_index.query, start, end)
+    
+    polymers_in_range = await repository.get_by_time_range(start, end)
+    
+    if not polymers_in_range:
+        return "", 0
+    
+    # Keep the reaction off the event loop so other requests are served
+    return await run_in_threadpool(react_records, polymers_in_range, rules)
 
 @router.get(
     "/reactor",
@@ -146,7 +322,8 @@ async def get_polymers(
 async def get_reactor_result(
     start: datetime = Query(..., description="Start timestamp (ISO8601)"),
     end: datetime = Query(..., description="End timestamp (ISO8601)"),
-    db: Session = Depends(get_db),
+    rules: ReactionRules = Depends(get_reaction_rules),
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -154,6 +331,8 @@ async def get_reactor_result(
     
     - All polymers in the time range are concatenated by timestamp
     - The combined polymer undergoes reaction simulation
+    - Each record's pre-reacted segment is reused, so only boundaries react
+    - Other rule sets than polarity react the raw polymers
     - Returns the stable polymer and reaction count
     """
     if start > end:
@@ -162,26 +341,293 @@ async def get_reactor_result(
             detail="Start timestamp must be before end timestamp"
         )
     
-    repository = PolymerRepository(db)
-    polymers_in_range = repository.get_by_time_range(start, end)
+    cache_key = make_key("reactor", start, end, rules=rules.spec)
+    if result_cache.enabled:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            result_polymer, total_reactions = cached
+            return ReactionResult(
+                start_timestamp=start,
+                end_timestamp=end,
+                reaction_count=total_reactions,
+                result=result_polymer
+            )
     
-    if not polymers_in_range:
-        return ReactionResult(
+    generation = result_cache.generation
+    result_polymer, total_reactions = await react_range(repository, start, end, rules)
+    
+    if result_cache.enabled:
+        result_cache.put(
+            cache_key, start, end, (result_polymer, total_reactions),
+            size=len(result_polymer) + 64, generation=generation
+        )
+    
+    return ReactionResult(
+        start_timestamp=start,
+        end_timestamp=end,
+        reaction_count=total_reactions,
+        result=result_polymer
+    )
+
+@router.post(
+    "/reactor/batch",
+    response_model=ReactorBatchResult,
+    responses={
+        401: {"model": ErrorResponse},
+        400: {"model": ErrorResponse}
+    }
+)
+async def get_reactor_batch(
+    batch: ReactorBatchRequest,
+    rules: ReactionRules = Depends(get_reaction_rules),
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get /reactor results for many time windows in one request.
+    
+    - The union of all windows is read once in timestamp order
+    - Overlapping and adjacent windows share the same reduced segments
+    - Results come back in the order the windows were given
+    """
+    if len(batch.windows) > settings.max_batch_windows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.max_batch_windows} windows per batch"
+        )
+    
+    windows = [(window.start, window.end) for window in batch.windows]
+    
+    if not windows:
+        results = []
+    elif settings.reactor_index_enabled and rules.canonical:
+        await load_reactor_index(repository)
+        results = await run_in_threadpool(
+            lambda: [reactor_index.query(start, end) for start, end in windows]
+        )
+    else:
+        records = await repository.get_by_time_range(
+            min(start for start, _ in windows), max(end for _, end in windows)
+        )
+        results = await run_in_threadpool(react_windows, records, windows, rules)
+    
+    return ReactorBatchResult(results=[
+        ReactionResult(
             start_timestamp=start,
             end_timestamp=end,
-            reaction_count=0,
-            result=""
+            reaction_count=reaction_count,
+            result=result_polymer
+        )
+        for (start, end), (result_polymer, reaction_count) in zip(windows, results)
+    ])
+
+@router.get(
+    "/reactor/sliding",
+    response_model=ReactorBatchResult,
+    responses={
+        401: {"model": ErrorResponse},
+        400: {"model": ErrorResponse}
+    }
+)
+async def get_reactor_sliding(
+    start: datetime = Query(..., description="Start of the first window (ISO8601)"),
+    end: datetime = Query(..., description="Latest end of a window (ISO8601)"),
+    width: timedelta = Query(..., description="Window width (ISO8601 duration, e.g. PT5M)"),
+    step: timedelta = Query(..., description="Step between windows (ISO8601 duration, e.g. PT1M)"),
+    rules: ReactionRules = Depends(get_reaction_rules),
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get /reactor results for a window rolling across a period.
+    
+    - Windows are [t, t + width] for t = start, start + step, ...
+    - The last window ends at or before end
+    - Records enter and leave the window incrementally
+    """
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start timestamp must be before end timestamp"
+        )
+    
+    if width <= timedelta(0) or step <= timedelta(0):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="width and step must be positive"
+        )
+    
+    window_count = (end - start - width) // step + 1 if width <= end - start else 0
+    if window_count > settings.max_batch_windows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.max_batch_windows} windows per request"
         )
     
-    # Extract polymer strings in timestamp order
-    polymer_strings = [record.polymer for record in polymers_in_range]
+    records = await repository.get_by_time_range(start, end)
     
-    # Process the concatenated polymers
-    result_polymer, total_reactions = process_multiple_polymers(polymer_strings)
+    def react():
+        metrics.add_monomers(sum(len(record.polymer) for record in records))
+        entries = [(record.timestamp, record_segment(record, rules)) for record in records]
+        return react_sliding_windows(
+            entries, naive_timestamp(start), naive_timestamp(end), width, step, rules
+        )
     
-    return ReactionResult(
+    results = await run_in_threadpool(react)
+    
+    return ReactorBatchResult(results=[
+        ReactionResult(
+            start_timestamp=window_start,
+            end_timestamp=window_end,
+            reaction_count=reaction_count,
+            result=result_polymer
+        )
+        for window_start, window_end, result_polymer, reaction_count in results
+    ])
+
+def feed_rows(state: ReactionState, rows: List[tuple]) -> None:
+    for polymer, reduced, reaction_count in rows:
+        # Stored segments only hold for the polarity rules
+        if reduced is None or not state.rules.canonical:
+            state.feed(polymer)
+        else:
+            state.feed_segment(reduced, reaction_count)
+
+async def feed_window(
+    repository: AsyncPolymerRepository, state: ReactionState, start: datetime, end: datetime
+) -> ReactionState:
+    """
+    Stream the window's rows into an incremental reaction state.
+    
+    Rows are read in batches through the repository and each batch is fed
+    in a worker thread, so the event loop never runs the reaction. Reading
+    and reacting interleave, so both are timed as one stage.
+    """
+    rows = 0
+    monomers = 0
+    with metrics.stage("stream"):
+        async for batch in repository.iter_batches(
+            lambda repo: repo.iter_segments_by_time_range(start, end)
+        ):
+            rows += len(batch)
+            monomers += sum(len(polymer) for polymer, _, _ in batch)
+            await run_in_threadpool(feed_rows, state, batch)
+    metrics.add_rows(rows)
+    metrics.add_monomers(monomers)
+    return state
+
+@router.get(
+    "/reactor/stream",
+    response_model=ReactionResult,
+    responses={
+        401: {"model": ErrorResponse},
+        400: {"model": ErrorResponse}
+    }
+)
+async def stream_reactor_result(
+    start: datetime = Query(..., description="Start timestamp (ISO8601)"),
+    end: datetime = Query(..., description="End timestamp (ISO8601)"),
+    rules: ReactionRules = Depends(get_reaction_rules),
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Same result as /reactor, computed and returned as a stream.
+    
+    - Rows are read in batches and fed straight into the reaction
+    - Memory is bounded by the surviving polymer, not the window size
+    - The result string is written out in pieces
+    """
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start timestamp must be before end timestamp"
+        )
+    
+    state = await feed_window(repository, ReactionState(rules), start, end)
+    
+    def body():
+        timestamp = TypeAdapter(datetime)
+        yield (
+            b'{"start_timestamp":' + timestamp.dump_json(start)
+            + b',"end_timestamp":' + timestamp.dump_json(end)
+            + b',"reaction_count":' + str(state.reaction_count).encode()
+            + b',"result":"'
+        )
+        # Polymers are letters only, so no JSON escaping is needed
+        for chunk in state.iter_result():
+            yield chunk.encode()
+        yield b'"}'
+    
+    return StreamingResponse(body(), media_type="application/json")
+
+@router.get(
+    "/reactor/stats",
+    response_model=ReactionStats,
+    responses={
+        401: {"model": ErrorResponse},
+        400: {"model": ErrorResponse}
+    }
+)
+async def get_reactor_stats(
+    start: datetime = Query(..., description="Start timestamp (ISO8601)"),
+    end: datetime = Query(..., description="End timestamp (ISO8601)"),
+    rules: ReactionRules = Depends(get_reaction_rules),
+    repository: AsyncPolymerRepository = Depends(repository_dependency),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Summarize the /reactor result without returning the polymer itself.
+    
+    - reaction_count matches /reactor
+    - length is the size of the stable polymer
+    - composition counts each surviving monomer
+    """
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start timestamp must be before end timestamp"
+        )
+    
+    counter = await feed_window(repository, ReactionCounter(rules), start, end)
+    
+    return ReactionStats(
         start_timestamp=start,
         end_timestamp=end,
-        reaction_count=total_reactions,
-        result=result_polymer
-    )
\ No newline at end of file
+        reaction_count=counter.reaction_count,
+        length=counter.length,
+        composition=counter.composition()
+    )
+
+@router.get(
+    "/diagnostics/slow-queries",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse}
+    }
+)
+async def get_slow_queries(current_user: dict = Depends(get_current_user)):
+    """
+    Recent statements over the slow query threshold, newest first, with
+    their bound parameters and SQLite query plan.
+    
+    Enable with SLOW_QUERY_LOG_ENABLED; the buffer is per process.
+    """
+    return {
+        "enabled": settings.slow_query_log_enabled,
+        "threshold_ms": slow_query_log.threshold_ms,
+        "queries": slow_query_log.entries()
+    }
+
+@router.get(
+    "/cache/stats",
+    response_model=dict,
+    responses={
+        401: {"model": ErrorResponse}
+    }
+)
+async def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Size and hit/miss/eviction/invalidation counters of the result cache.
+    """
+    return result_cache.stats()
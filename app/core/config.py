@@ -1,3 +1,5 @@
+import os
+
 from pydantic_settings import BaseSettings
 from typing import List
 
@@ -7,6 +9,87 @@ class Settings(BaseSettings):
     secret_key: str = "your-super-secret-key-change-in-production"
     api_keys: List[str] = ["test-key-123", "dev-key-456"]
     
+    # Serve requests through SQLAlchemy asyncio and aiosqlite
+    async_database: bool = False
+    
+    # Connection pool for file databases
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    
+    # SQLite performance profile applied to every new connection
+    sqlite_tuning: bool = True
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -65536  # negative values are KiB, so 64 MiB
+    sqlite_mmap_size: int = 268_435_456
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout_ms: int = 5000
+    
+    # Serve substring filters of 3+ letters from an FTS5 trigram index
+    substring_index_enabled: bool = True
+    
+    # Log statements slower than slow_query_threshold_ms with their query plan,
+    # keeping the last slow_query_log_size for /diagnostics/slow-queries
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 100.0
+    slow_query_log_size: int = 100
+    # Also log statements whose plan scans a whole table, however fast
+    slow_query_log_full_scans: bool = False
+    
+    # Record request and per-stage latency for /metrics
+    metrics_enabled: bool = True
+    
+    # Keep an in-memory segment tree of reduced segments for /reactor. It
+    # lives in one process, so serve.py runs one worker with it
+    reactor_index_enabled: bool = False
+    
+    # Keep each month of records in its own table, polymer_records_YYYYMM.
+    # Schema upgrades move rows into or out of partitions to match
+    partitioned_storage: bool = False
+    
+    # Move records older than archive_after_days into compressed block files
+    # of archive_block_rows records in archive_dir, with
+    # python -m app.core.migrations --archive. Reads merge them back in
+    archive_dir: str = ""
+    archive_after_days: int = 90
+    archive_block_rows: int = 4096
+    
+    # Reaction rule set for the reactor endpoints unless a request picks one,
+    # e.g. "polarity;inert=xX;pairs=ab" (see app/services/reaction_rules.py)
+    reaction_rules: str = "polarity"
+    
+    # Polymers at least this long are reacted with the NumPy engine; /reactor
+    # reaches it for windows reacted with non-polarity rules
+    vectorized_reaction_threshold: int = 10_000
+    
+    # Server processes started by serve.py, and how long each one lets
+    # in-flight requests finish when asked to stop
+    web_workers: int = os.cpu_count() or 1
+    graceful_shutdown_timeout: int = 30
+    
+    # Create and upgrade the schema as each worker starts; serve.py turns
+    # this off after doing it once before the workers start
+    init_schema_on_startup: bool = True
+    
+    # Process pool size for parallel reactions, and the reduced monomer count
+    # above which /reactor uses it
+    reactor_workers: int = os.cpu_count() or 1
+    parallel_reaction_threshold: int = 1_000_000
+    
+    # Byte budget of the /reactor and GET /polymers result cache; 0 disables
+    # it. Each worker has its own cache, so serve.py runs one worker with it
+    result_cache_max_bytes: int = 0
+    
+    # Most windows one /reactor/batch request may ask for
+    max_batch_windows: int = 1000
+    
+    # Largest page GET /polymers returns for one request
+    max_page_size: int = 10_000
+    
+    # Records buffered per database flush for NDJSON ingestion
+    ingest_chunk_size: int = 1000
+    
     class Config:
         env_file = ".env"
         extra = "allow"  # This allows extra fields in the .env file
@@ -1,14 +1,202 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Distinct statements whose query plan is remembered
+PLAN_CACHE_SIZE = 256
+
+def naive_timestamp(value: datetime) -> datetime:
+    # SQLite stores timestamps without a zone, so compare on wall-clock time
+    return value.replace(tzinfo=None)
+
+def is_memory_database(database_url: str) -> bool:
+    return database_url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in database_url
+
+def apply_sqlite_profile(engine: Engine) -> None:
+    """
+    Set the configured performance pragmas on every new SQLite connection.
+    
+    WAL lets readers and the writer work at the same time, and
+    synchronous=NORMAL is safe in WAL mode while skipping most fsyncs.
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+    ]
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def _loggable(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    return text if len(text) <= 200 else text[:200] + "..."
+
+class SlowQueryLog:
+    """
+    Ring buffer of statements that took longer than a threshold.
+    
+    Statements are timed between the before/after_cursor_execute events.
+    On SQLite that covers running the statement up to its first row, which
+    includes any sort or temporary B-tree, but not stepping through the
+    remaining rows. Each slow statement is logged with its parameters and,
+    on SQLite, its EXPLAIN QUERY PLAN; plans are cached per statement, so
+    with log_full_scans every statement that scans a whole table can be
+    caught regardless of its time.
+    """
+    
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        size: Optional[int] = None,
+        log_full_scans: Optional[bool] = None
+    ):
+        self.threshold_ms = settings.slow_query_threshold_ms if threshold_ms is None else threshold_ms
+        self.log_full_scans = settings.slow_query_log_full_scans if log_full_scans is None else log_full_scans
+        self._entries: deque = deque(maxlen=settings.slow_query_log_size if size is None else size)
+        self._plans: "OrderedDict[str, Optional[List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+    
+    def detach(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_execute)
+        event.remove(engine, "after_cursor_execute", self._after_execute)
+    
+    def entries(self) -> List[dict]:
+        """
+        Recorded slow statements, newest first.
+        """
+        with self._lock:
+            return list(reversed(self._entries))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+    
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the statement's own context, so a failed statement leaves nothing behind
+        context._slow_query_started = time.perf_counter()
+    
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+        slow = elapsed_ms >= self.threshold_ms
+        if not slow and not self.log_full_scans:
+            return
+        
+        if executemany:
+            # Only the first parameter set is explained and recorded
+            parameters = parameters[0] if parameters else ()
+        plan = self._plan(conn, statement, parameters)
+        full_scan = bool(plan) and any(_is_full_scan(step) for step in plan)
+        if not slow and not full_scan:
+            return
+        
+        if isinstance(parameters, dict):
+            logged_parameters = {key: _loggable(value) for key, value in parameters.items()}
+        else:
+            logged_parameters = [_loggable(value) for value in parameters or ()]
+        entry = {
+            "recorded_at": datetime.utcnow().isoformat(),
+            "duration_ms": round(elapsed_ms, 3),
+            "statement": statement,
+            "parameters": logged_parameters,
+            "executemany": executemany,
+            "full_scan": full_scan,
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms%s): %s | parameters=%s | plan=%s",
+            elapsed_ms, ", full scan" if full_scan else "", statement, logged_parameters, plan
+        )
+    
+    def _plan(self, conn, statement: str, parameters) -> Optional[List[str]]:
+        if conn.dialect.name != "sqlite":
+            return None
+        with self._lock:
+            if statement in self._plans:
+                self._plans.move_to_end(statement)
+                return self._plans[statement]
+        
+        # Straight on the DBAPI connection, so no events fire for it
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+            plan = [row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            plan = [f"unavailable: {e}"]
+        finally:
+            cursor.close()
+        
+        with self._lock:
+            self._plans[statement] = plan
+            while len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return plan
+
+def _is_full_scan(step: str) -> bool:
+    # "SCAN t" and "SCAN t USING INDEX i" visit every row; FTS lookups don't
+    return step.startswith("SCAN ") and "VIRTUAL TABLE" not in step and "CONSTANT ROW" not in step
+
+# Shared by every engine built while the slow query log is enabled
+slow_query_log = SlowQueryLog()
+
+def build_engine(database_url: str, tuned: bool = None) -> Engine:
+    """
+    Create an engine with explicit pool sizing and, for SQLite, the
+    performance profile from Settings.
+    """
+    if tuned is None:
+        tuned = settings.sqlite_tuning
+    
+    options = {}
+    if not is_memory_database(database_url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout
+        )
+    
+    new_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        **options
+    )
+    
+    if tuned and database_url.startswith("sqlite"):
+        apply_sqlite_profile(new_engine)
+    if settings.slow_query_log_enabled:
+        slow_query_log.attach(new_engine)
+    return new_engine
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url, 
-    connect_args={"check_same_thread": False}
-)
+engine = build_engine(settings.database_url)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -22,4 +210,54 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def async_database_url(database_url: str) -> str:
+    """
+    Map a sync SQLite URL onto the aiosqlite driver.
+    """
+    if database_url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + database_url[len("sqlite://"):]
+    return database_url
+
+def build_async_engine(database_url: str):
+    """
+    Create an asyncio engine on the aiosqlite driver with the same SQLite
+    profile as build_engine.
+    
+    aiosqlite engines use a pool without sizing, so the pool settings only
+    apply to other databases.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    
+    options = {}
+    if not database_url.startswith("sqlite") and not is_memory_database(database_url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout
+        )
+    
+    new_engine = create_async_engine(async_database_url(database_url), **options)
+    if settings.sqlite_tuning and database_url.startswith("sqlite"):
+        apply_sqlite_profile(new_engine.sync_engine)
+    if settings.slow_query_log_enabled:
+        slow_query_log.attach(new_engine.sync_engine)
+    return new_engine
+
+# The async engine is only built when enabled, so aiosqlite stays optional
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.async_database:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    
+    async_engine = build_async_engine(settings.database_url)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""
+Request and per-stage latency metrics in Prometheus text format.
+
+The middleware times every request. Code inside a request reports stages
+(query, react, serialize, ...) and row/monomer counts into a per-request
+buffer held in a context variable, which also follows the request into
+worker threads. The buffer is written to the shared histograms once, when
+the response is finished, under the route's path template. Outside a
+request the hooks do nothing.
+
+Metrics are per process; with several workers each one reports its own.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# Seconds, from sub-millisecond index lookups to multi-second scans
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    bucket_labels = _labels(self.label_names, labels, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.histogram(
+    "polymer_http_request_duration_seconds", "Time to serve a request.", ("method", "endpoint", "status")
+)
+STAGE_SECONDS = registry.histogram(
+    "polymer_stage_duration_seconds", "Time spent in each stage of a request.", ("endpoint", "stage")
+)
+RESPONSE_BYTES = registry.histogram(
+    "polymer_http_response_size_bytes", "Response body size.", ("endpoint",), SIZE_BUCKETS
+)
+ROWS_FETCHED = registry.counter(
+    "polymer_rows_fetched_total", "Rows read from the database.", ("endpoint",)
+)
+MONOMERS_REACTED = registry.counter(
+    "polymer_monomers_reacted_total", "Monomers fed into the reactor.", ("endpoint",)
+)
+
+class RequestMetrics:
+    """
+    Stage timings and counts of one request, flushed when it completes.
+    """
+    __slots__ = ("stages", "running", "rows", "monomers")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        # Stages being timed right now
+        self.running: Set[str] = set()
+        self.rows = 0
+        self.monomers = 0
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a block as one stage of the current request.
+
+    A stage entered again from inside itself is already being timed, so
+    only the outermost block counts.
+    """
+    current = _current.get()
+    if current is None or name in current.running:
+        yield
+        return
+    current.running.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.running.discard(name)
+        current.stages[name] = current.stages.get(name, 0.0) + time.perf_counter() - started
+
+def timed(name: str, count_rows: bool = False):
+    """
+    Decorator form of stage(); with count_rows, the length of the returned
+    list is added to the rows fetched by the outermost call.
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _current.get()
+            if current is None or name in current.running:
+                return func(*args, **kwargs)
+            with stage(name):
+                result = func(*args, **kwargs)
+            if count_rows:
+                current.rows += len(result)
+            return result
+        return wrapper
+    return decorate
+
+def add_rows(count: int) -> None:
+    current = _current.get()
+    if current is not None:
+        current.rows += count
+
+def add_monomers(count: int) -> None:
+    current = _current.get()
+    if current is not None:
+        current.monomers += count
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing requests and flushing their stage metrics.
+
+    Requests that match no route are reported as "unmatched", so unknown
+    paths can't grow the number of series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        current = RequestMetrics()
+        token = _current.set(current)
+        status_code = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+
+            route = scope.get("route")
+            endpoint = route.path if route is not None else "unmatched"
+            REQUEST_SECONDS.observe(elapsed, scope["method"], endpoint, str(status_code))
+            RESPONSE_BYTES.observe(body_bytes, endpoint)
+            for name, seconds in current.stages.items():
+                STAGE_SECONDS.observe(seconds, endpoint, name)
+            # Routing, validation, encoding and anything not wrapped in a stage
+            STAGE_SECONDS.observe(max(elapsed - sum(current.stages.values()), 0.0), endpoint, "other")
+            if current.rows:
+                ROWS_FETCHED.inc(current.rows, endpoint)
+            if current.monomers:
+                MONOMERS_REACTED.inc(current.monomers, endpoint)
@@ -0,0 +1,244 @@
+"""
+Bring an existing database up to the current schema.
+
+New tables and indexes are created, columns added since a database was first
+created are added in place, and their values are backfilled for old rows.
+
+Run from the repository root:
+    python -m app.core.migrations
+
+With partitioned_storage, rows are moved into monthly partitions (and back
+into polymer_records when it is turned off). Whole months older than a date
+can be dropped to enforce retention; running servers keep serving dropped
+months from their reactor index and result cache until restarted:
+    python -m app.core.migrations --drop-partitions-before 2023-01-01
+
+Records older than ARCHIVE_AFTER_DAYS are moved into the archive in
+ARCHIVE_DIR with:
+    python -m app.core.migrations --archive
+"""
+import argparse
+import sqlite3
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import Table, and_, delete, func, insert, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base, engine
+from app.models import partitions
+from app.models.database import PolymerRecord, prefer_timestamp_length_index, trigram_index_enabled, trigram_table_ddl
+from app.repositories.polymer_repository import PolymerRepository
+from app.services import polymer_codec
+from app.services.polymer_service import segment_columns
+
+# Columns added to polymer_records after its first release
+ADDED_COLUMNS = {
+    "reduced": "VARCHAR(128)",
+    "reaction_count": "INTEGER",
+    "length": "INTEGER",
+}
+
+def upgrade_schema(bind: Engine = engine, batch_size: int = 1000) -> None:
+    """
+    Create missing tables, columns and indexes, then backfill derived columns.
+    """
+    Base.metadata.create_all(bind=bind)
+
+    for table in record_tables(bind):
+        existing = {column["name"] for column in inspect(bind).get_columns(table.name)}
+        with bind.begin() as connection:
+            for name, column_type in ADDED_COLUMNS.items():
+                if name not in existing:
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+        if "reduced_packed" in existing:
+            unpack_segments(bind, table, batch_size)
+
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+        with bind.begin() as connection:
+            prefer_timestamp_length_index(connection, table)
+        
+        if trigram_index_enabled() and not inspect(bind).has_table(partitions.trigram_table(table.name)):
+            create_trigram_index(bind, table.name)
+
+    backfill_lengths(bind)
+    backfill_segments(bind, batch_size)
+
+    if settings.partitioned_storage:
+        partition_records(bind)
+    else:
+        merge_partitions(bind)
+
+def record_tables(bind: Engine) -> List[Table]:
+    """
+    polymer_records followed by its partitions.
+    """
+    with bind.connect() as connection:
+        names = partitions.list_partitions(connection)
+    return [PolymerRecord.__table__] + [partitions.partition_table(name) for name in names]
+
+def create_trigram_index(bind: Engine, table: str = PolymerRecord.__tablename__) -> None:
+    """
+    Create the substring index and fill it from the existing rows.
+    """
+    trigram_table = partitions.trigram_table(table)
+    with bind.begin() as connection:
+        connection.execute(text(trigram_table_ddl(trigram_table, table)))
+        connection.execute(text(f"INSERT INTO {trigram_table} ({trigram_table}) VALUES ('rebuild')"))
+
+def _rebuild_trigram_index(connection, table: str) -> None:
+    if trigram_index_enabled():
+        trigram_table = partitions.trigram_table(table)
+        connection.execute(text(f"INSERT INTO {trigram_table} ({trigram_table}) VALUES ('rebuild')"))
+
+def partition_records(bind: Engine) -> int:
+    """
+    Move rows of polymer_records into their monthly partitions, one month
+    per transaction.
+
+    Returns:
+        int: Number of rows moved
+    """
+    source = PolymerRecord.__table__
+    columns = [column.name for column in source.columns if column.name != "id"]
+
+    moved = 0
+    while True:
+        with bind.begin() as connection:
+            first = connection.scalar(select(func.min(source.c.timestamp)))
+            if first is None:
+                break
+            name = partitions.partition_name(first)
+            month_start, month_end = partitions.partition_bounds(name)
+            month = and_(source.c.timestamp >= month_start, source.c.timestamp < month_end)
+
+            partitions.create_partition(connection, name)
+            # Rows get new ids in the partition's id range
+            moved += connection.execute(insert(partitions.partition_table(name)).from_select(
+                columns, select(*(source.c[column] for column in columns)).where(month)
+            )).rowcount
+            connection.execute(delete(source).where(month))
+            _rebuild_trigram_index(connection, name)
+
+    if moved:
+        with bind.begin() as connection:
+            _rebuild_trigram_index(connection, source.name)
+    return moved
+
+def merge_partitions(bind: Engine) -> int:
+    """
+    Move the rows of every partition back into polymer_records and drop
+    the partitions.
+
+    Returns:
+        int: Number of rows moved
+    """
+    target = PolymerRecord.__table__
+    columns = [column.name for column in target.columns if column.name != "id"]
+
+    moved = 0
+    for table in record_tables(bind)[1:]:
+        with bind.begin() as connection:
+            moved += connection.execute(insert(target).from_select(
+                columns, select(*(table.c[column] for column in columns)).order_by(table.c.timestamp)
+            )).rowcount
+            partitions.drop_partition(connection, table.name)
+
+    if moved:
+        with bind.begin() as connection:
+            _rebuild_trigram_index(connection, target.name)
+    return moved
+
+def drop_partitions_before(bind: Engine, cutoff: datetime) -> List[str]:
+    """
+    Drop the partitions whose whole month is before cutoff.
+
+    Returns:
+        List[str]: Names of the dropped partitions
+    """
+    with bind.connect() as connection:
+        names = [
+            name for name in partitions.list_partitions(connection)
+            if partitions.partition_bounds(name)[1] <= cutoff
+        ]
+    for name in names:
+        with bind.begin() as connection:
+            partitions.drop_partition(connection, name)
+    return names
+
+def backfill_lengths(bind: Engine) -> None:
+    with bind.begin() as connection:
+        connection.execute(
+            update(PolymerRecord)
+            .where(PolymerRecord.length.is_(None))
+            .values(length=func.length(PolymerRecord.polymer))
+        )
+
+def backfill_segments(bind: Engine, batch_size: int = 1000) -> None:
+    """
+    Store the pre-reacted segment for rows that don't have one yet.
+    """
+    with Session(bind=bind) as session:
+        while True:
+            rows = session.execute(
+                select(PolymerRecord.id, PolymerRecord.polymer)
+                .where(PolymerRecord.reduced.is_(None))
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            updates = [{"id": row.id, **segment_columns(row.polymer)} for row in rows]
+            session.execute(update(PolymerRecord), updates)
+            session.commit()
+
+def unpack_segments(bind: Engine, table: Table, batch_size: int = 1000) -> None:
+    """
+    Store segments that older releases kept 6-bit packed as text again,
+    then drop their reduced_packed column.
+    """
+    packed_rows = text(
+        f"SELECT id, reduced_packed FROM {table.name} "
+        "WHERE reduced_packed IS NOT NULL ORDER BY id LIMIT :limit"
+    )
+    store = text(f"UPDATE {table.name} SET reduced = :reduced, reduced_packed = NULL WHERE id = :row_id")
+    while True:
+        with bind.begin() as connection:
+            rows = connection.execute(packed_rows, {"limit": batch_size}).all()
+            if not rows:
+                break
+            connection.execute(store, [
+                {"row_id": row.id, "reduced": polymer_codec.unpack(row.reduced_packed)} for row in rows
+            ])
+
+    # DROP COLUMN needs SQLite 3.35; older versions keep the unused column
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        with bind.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table.name} DROP COLUMN reduced_packed"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upgrade the polymer database schema")
+    parser.add_argument(
+        "--drop-partitions-before", type=datetime.fromisoformat, metavar="DATE",
+        help="drop the monthly partitions that end on or before DATE"
+    )
+    parser.add_argument("--archive", action="store_true", help="archive records older than ARCHIVE_AFTER_DAYS")
+    args = parser.parse_args()
+    if args.archive and not settings.archive_dir:
+        parser.error("--archive needs ARCHIVE_DIR to be set")
+
+    upgrade_schema()
+    print("✅ Database schema is up to date")
+
+    if args.drop_partitions_before:
+        dropped = drop_partitions_before(engine, args.drop_partitions_before)
+        print(f"✅ Dropped {len(dropped)} partitions: {', '.join(dropped) or 'none'}")
+
+    if args.archive:
+        cutoff = datetime.utcnow() - timedelta(days=settings.archive_after_days)
+        with Session(bind=engine) as session:
+            archived = PolymerRepository(session).archive_before(cutoff)
+        print(f"✅ Archived {archived} records older than {cutoff:%Y-%m-%d %H:%M}")
@@ -2,20 +2,23 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.core.database import engine, Base
-from app.models.database import PolymerRecord
+from app.core.database import engine
+from app.core.metrics import MetricsMiddleware
+from app.core.migrations import upgrade_schema
 from app.api.routes import router
 from app.core.config import settings
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.services.polymer_service import shutdown_reaction_pool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print(f"🚀 {settings.app_name} starting up...")
+    if settings.init_schema_on_startup:
+        # Create database tables and upgrade older databases
+        upgrade_schema(engine)
     yield
     # Shutdown
+    shutdown_reaction_pool()
     print(f"👋 {settings.app_name} shutting down...")
 
 # Initialize FastAPI app with lifespan
@@ -37,6 +40,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time every request; added last so it also covers the CORS middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(router)
 
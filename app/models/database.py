@@ -1,6 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, DDL, Table, event, text
+from app.core.config import settings
 from app.core.database import Base
 import datetime
+import sqlite3
+
+# FTS5 trigram table indexing polymer_records.polymer for substring search
+TRIGRAM_TABLE = "polymer_trigrams"
+
+def trigram_table_ddl(name: str, content: str) -> str:
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+        f"polymer, content='{content}', content_rowid='id', tokenize='trigram')"
+    )
+
+TRIGRAM_TABLE_DDL = trigram_table_ddl(TRIGRAM_TABLE, "polymer_records")
+
+def trigram_index_enabled() -> bool:
+    # The trigram tokenizer needs SQLite 3.34 or newer
+    return settings.substring_index_enabled and sqlite3.sqlite_version_info >= (3, 34, 0)
 
 class PolymerRecord(Base):
     __tablename__ = "polymer_records"
@@ -8,4 +25,58 @@ class PolymerRecord(Base):
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, unique=True, index=True, nullable=False)
     polymer = Column(String(128), nullable=False)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
\ No newline at end of file
+    # Pre-reacted form of the polymer and the reactions it took to get there
+    reduced = Column(String(128), nullable=True)
+    reaction_count = Column(Integer, nullable=True)
+    length = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        # Length filters are evaluated from the index within a time range
+        Index("ix_polymer_records_timestamp_length", "timestamp", "length"),
+    )
+
+def _create_trigram_index(ddl, target, bind, **kw) -> bool:
+    return trigram_index_enabled()
+
+event.listen(
+    PolymerRecord.__table__,
+    "after_create",
+    DDL(TRIGRAM_TABLE_DDL).execute_if(dialect="sqlite", callable_=_create_trigram_index)
+)
+event.listen(
+    PolymerRecord.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {TRIGRAM_TABLE}").execute_if(dialect="sqlite")
+)
+
+def prefer_timestamp_length_index(connection, table: Table) -> None:
+    """
+    Have SQLite read time ranges ordered by timestamp through the
+    timestamp/length index, which can check a length filter before reading
+    the row.
+    
+    Both timestamp indexes cost the same for such a range, so the table is
+    analyzed and the unique index is marked "unordered" in sqlite_stat1,
+    which keeps the planner from using it for ORDER BY; it still serves
+    timestamp lookups. A later ANALYZE or PRAGMA optimize drops the mark
+    until this runs again.
+    """
+    index = f"ix_{table.name}_timestamp"
+    # Sample the indexes rather than reading them in full
+    connection.execute(text("PRAGMA analysis_limit = 1000"))
+    connection.execute(text(f"ANALYZE {table.name}"))
+    stat = connection.execute(
+        text("SELECT stat FROM sqlite_stat1 WHERE idx = :index"), {"index": index}
+    ).scalar()
+    connection.execute(text("DELETE FROM sqlite_stat1 WHERE idx = :index"), {"index": index})
+    connection.execute(text(
+        "INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (:table, :index, :stat)"
+    ), {
+        "table": table.name,
+        "index": index,
+        # ANALYZE skips empty tables; keep SQLite's default estimate of about a million rows
+        "stat": f"{stat or '1048576 1'} unordered",
+    })
+    # Other connections load the statistics with the schema
+    connection.execute(text("ANALYZE sqlite_master"))
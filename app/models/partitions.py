@@ -0,0 +1,107 @@
+"""
+Monthly partitions of polymer_records.
+
+With partitioned_storage, each calendar month of timestamps lives in its own
+table, polymer_records_YYYYMM. That table has the same columns and indexes as
+polymer_records and, when enabled, its own trigram table. Range reads only
+touch the months they overlap, each B-tree only grows for one month, and old
+data is removed by dropping whole tables instead of a mass DELETE.
+
+Ids stay unique across partitions. Each table's AUTOINCREMENT sequence
+starts at its month number shifted left by 32 bits, so records loaded from
+different months never share an identity in a session.
+"""
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import MetaData, Table, text
+from sqlalchemy.orm import aliased
+
+from app.models.database import (
+    PolymerRecord, TRIGRAM_TABLE, prefer_timestamp_length_index, trigram_index_enabled, trigram_table_ddl
+)
+
+BASE_TABLE = PolymerRecord.__tablename__
+PARTITION_PATTERN = re.compile(rf"^{BASE_TABLE}_(\d{{4}})(\d{{2}})$")
+ID_SHIFT = 32
+
+# Partition tables are kept out of Base.metadata, so create_all and
+# drop_all only ever see polymer_records itself
+_metadata = MetaData()
+_entities: Dict[str, Any] = {}
+
+def partition_name(timestamp: datetime) -> str:
+    return f"{BASE_TABLE}_{timestamp.year:04d}{timestamp.month:02d}"
+
+def partition_bounds(name: str) -> Tuple[datetime, datetime]:
+    """
+    First timestamp of the partition's month and of the month after it.
+    """
+    year, month = (int(part) for part in PARTITION_PATTERN.match(name).groups())
+    return datetime(year, month, 1), datetime(year + month // 12, month % 12 + 1, 1)
+
+def trigram_table(name: str) -> str:
+    # polymer_records -> polymer_trigrams, polymer_records_202307 -> polymer_trigrams_202307
+    return TRIGRAM_TABLE + name[len(BASE_TABLE):]
+
+def id_base(name: str) -> int:
+    year, month = (int(part) for part in PARTITION_PATTERN.match(name).groups())
+    return (year * 12 + month - 1) << ID_SHIFT
+
+def partition_table(name: str) -> Table:
+    table = _metadata.tables.get(name)
+    if table is None:
+        table = PolymerRecord.__table__.to_metadata(_metadata, name=name)
+        # Index names are global in SQLite; explicitly named ones are copied as is
+        for index in table.indexes:
+            if not index.name.startswith(f"ix_{name}_"):
+                index.name = index.name.replace(BASE_TABLE, name, 1)
+        # Ids continue from the seeded sqlite_sequence row, see create_partition
+        table.dialect_options["sqlite"]["autoincrement"] = True
+    return table
+
+def partition_entity(name: str) -> Any:
+    """
+    PolymerRecord mapped onto one partition; queries on it return PolymerRecords.
+    """
+    entity = _entities.get(name)
+    if entity is None:
+        entity = _entities[name] = aliased(PolymerRecord, partition_table(name), adapt_on_names=True)
+    return entity
+
+def list_partitions(connection) -> List[str]:
+    """
+    Names of the existing partitions, oldest first.
+    """
+    names = connection.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB :pattern"
+    ), {"pattern": f"{BASE_TABLE}_[0-9][0-9][0-9][0-9][0-9][0-9]"}).scalars()
+    return sorted(names)
+
+def overlapping(names: List[str], start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+    """
+    The partitions that can hold timestamps in [start, end].
+    """
+    # Timestamps are stored as wall-clock time, so are the month boundaries
+    first = partition_name(start) if start is not None else ""
+    last = partition_name(end) if end is not None else "~"
+    return [name for name in names if first <= name <= last]
+
+def create_partition(connection, name: str) -> None:
+    """
+    Create a partition with its indexes, trigram table and id range.
+    """
+    table = partition_table(name)
+    table.create(connection, checkfirst=True)
+    prefer_timestamp_length_index(connection, table)
+    connection.execute(text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT :name, :seq "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+    ), {"name": name, "seq": id_base(name)})
+    if trigram_index_enabled():
+        connection.execute(text(trigram_table_ddl(trigram_table(name), name)))
+
+def drop_partition(connection, name: str) -> None:
+    connection.execute(text(f"DROP TABLE IF EXISTS {trigram_table(name)}"))
+    partition_table(name).drop(connection, checkfirst=True)
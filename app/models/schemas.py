@@ -1,6 +1,6 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, model_validator
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class PolymerBase(BaseModel):
     timestamp: datetime
@@ -24,6 +24,7 @@ class PolymerResponse(PolymerBase):
 
 class PolymerList(BaseModel):
     polymers: List[PolymerResponse]
+    next_cursor: Optional[str] = None
 
 class ReactionResult(BaseModel):
     start_timestamp: datetime
@@ -31,5 +32,38 @@ class ReactionResult(BaseModel):
     reaction_count: int
     result: str
 
+class TimeWindow(BaseModel):
+    start: datetime
+    end: datetime
+    
+    @model_validator(mode='after')
+    def validate_order(self):
+        if self.start > self.end:
+            raise ValueError('Start timestamp must be before end timestamp')
+        return self
+
+class ReactorBatchRequest(BaseModel):
+    windows: List[TimeWindow]
+
+class ReactorBatchResult(BaseModel):
+    results: List[ReactionResult]
+
+class ReactionStats(BaseModel):
+    start_timestamp: datetime
+    end_timestamp: datetime
+    reaction_count: int
+    length: int
+    composition: Dict[str, int]
+
+class IngestChunk(BaseModel):
+    chunk: int
+    ingested: int
+    first_timestamp: datetime
+    last_timestamp: datetime
+
+class IngestSummary(BaseModel):
+    ingested: int
+    chunks: List[IngestChunk]
+
 class ErrorResponse(BaseModel):
     detail: str
\ No newline at end of file
@@ -0,0 +1,352 @@
+"""
+Cold-tier archive of old polymer records in compressed block files.
+
+Archived records are written in timestamp order to files in archive_dir.
+Each file is a run of blocks followed by a block index. A block holds up to
+archive_block_rows records stored column by column: ids, delta-encoded
+timestamps, creation times, reaction counts, and the polymer and reduced
+texts, compressed together with zlib. The index keeps each block's first
+and last timestamp, so a range read only decompresses the blocks it
+overlaps. Files are immutable once written; decompressed blocks are cached.
+
+Records keep their ids and timestamps in the archive. A record can briefly
+be both archived and still in SQLite while an archival run commits;
+merge_sorted yields the SQLite copy only.
+"""
+import heapq
+import os
+import struct
+import sys
+import threading
+import uuid
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import naive_timestamp
+
+MAGIC = b"PARC"
+SUFFIX = ".parc"
+FOOTER = struct.Struct("<I4s")  # block count, magic
+INDEX_ENTRY = struct.Struct("<qqQII")  # first, last, offset, size, count
+COUNT = struct.Struct("<I")
+
+# Decompressed blocks kept in memory
+BLOCK_CACHE_SIZE = 64
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+NULL_TIME = -2 ** 63
+NULL_COUNT = -1
+NULL_SIZE = 0xFFFF
+
+class ArchivedRecord(NamedTuple):
+    """
+    A record read back from the archive, with the attributes of a PolymerRecord.
+    """
+    id: int
+    timestamp: datetime
+    polymer: str
+    reduced: Optional[str]
+    reaction_count: Optional[int]
+    created_at: Optional[datetime]
+
+    @property
+    def length(self) -> int:
+        return len(self.polymer)
+
+class ArchiveBlock(NamedTuple):
+    path: str
+    offset: int
+    size: int
+    count: int
+    first: datetime
+    last: datetime
+
+def _micros(value: Optional[datetime]) -> int:
+    return NULL_TIME if value is None else (naive_timestamp(value) - EPOCH) // MICROSECOND
+
+def _time(micros: int) -> Optional[datetime]:
+    return None if micros == NULL_TIME else EPOCH + micros * MICROSECOND
+
+def _little_endian(column: array) -> array:
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+def _texts(values: List[Optional[str]]) -> tuple:
+    encoded = [value.encode() if value is not None else b"" for value in values]
+    sizes = array("H", (NULL_SIZE if value is None else len(data) for value, data in zip(values, encoded)))
+    return sizes, b"".join(encoded)
+
+def encode_block(records: List) -> bytes:
+    """
+    Compress timestamp-sorted records into one block.
+    """
+    stamps = [_micros(record.timestamp) for record in records]
+    polymer_sizes, polymers = _texts([record.polymer for record in records])
+    reduced_sizes, reduced_text = _texts([record.reduced for record in records])
+
+    columns = [
+        array("q", (record.id for record in records)),
+        array("q", [stamps[0]] + [b - a for a, b in zip(stamps, stamps[1:])]),
+        array("q", (_micros(record.created_at) for record in records)),
+        array("i", (NULL_COUNT if record.reaction_count is None else record.reaction_count for record in records)),
+        polymer_sizes,
+        reduced_sizes,
+    ]
+    payload = [COUNT.pack(len(records))]
+    payload.extend(_little_endian(column).tobytes() for column in columns)
+    payload.extend((polymers, reduced_text))
+    return zlib.compress(b"".join(payload))
+
+def _column(typecode: str, data: memoryview, offset: int, count: int) -> tuple:
+    column = array(typecode)
+    end = offset + column.itemsize * count
+    column.frombytes(data[offset:end])
+    return _little_endian(column), end
+
+def _split(sizes: array, data: bytes, offset: int) -> tuple:
+    values = []
+    for size in sizes:
+        if size == NULL_SIZE:
+            values.append(None)
+        else:
+            values.append(data[offset:offset + size].decode())
+            offset += size
+    return values, offset
+
+@lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def read_block(path: str, offset: int, size: int) -> Tuple[List[datetime], List[ArchivedRecord]]:
+    """
+    Decompress one block into its timestamps and records, in timestamp order.
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        payload = zlib.decompress(file.read(size))
+    data = memoryview(payload)
+    (count,) = COUNT.unpack_from(data)
+
+    position = COUNT.size
+    ids, position = _column("q", data, position, count)
+    deltas, position = _column("q", data, position, count)
+    created, position = _column("q", data, position, count)
+    counts, position = _column("i", data, position, count)
+    polymer_sizes, position = _column("H", data, position, count)
+    reduced_sizes, position = _column("H", data, position, count)
+    polymers, position = _split(polymer_sizes, payload, position)
+    reduced, position = _split(reduced_sizes, payload, position)
+
+    timestamps = []
+    records = []
+    stamp = 0
+    for i in range(count):
+        stamp += deltas[i]
+        timestamp = _time(stamp)
+        timestamps.append(timestamp)
+        records.append(ArchivedRecord(
+            ids[i], timestamp, polymers[i], reduced[i],
+            None if counts[i] == NULL_COUNT else counts[i], _time(created[i])
+        ))
+    return timestamps, records
+
+class ArchiveWriter:
+    """
+    Write one archive file block by block.
+
+    The file only becomes visible when the writer is closed without an
+    error; until then it is a temporary file that readers ignore.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.temporary = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+        self.file = open(self.temporary, "wb")
+        self.file.write(MAGIC)
+        self.index: List[bytes] = []
+        self.first: Optional[datetime] = None
+        self.path: Optional[str] = None
+
+    def write_block(self, records: List) -> None:
+        """
+        Append a block of records; blocks must be written in timestamp order.
+        """
+        block = encode_block(records)
+        offset = self.file.tell()
+        self.file.write(block)
+        self.index.append(INDEX_ENTRY.pack(
+            _micros(records[0].timestamp), _micros(records[-1].timestamp), offset, len(block), len(records)
+        ))
+        if self.first is None:
+            self.first = naive_timestamp(records[0].timestamp)
+
+    def close(self) -> Optional[str]:
+        """
+        Write the block index and publish the file.
+
+        Returns:
+            Optional[str]: Path of the new file, or None if no block was written
+        """
+        if not self.index:
+            self.abort()
+            return None
+        self.file.write(b"".join(self.index))
+        self.file.write(FOOTER.pack(len(self.index), MAGIC))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        name = f"records-{self.first:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}{SUFFIX}"
+        self.path = os.path.join(self.directory, name)
+        os.replace(self.temporary, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        self.file.close()
+        os.remove(self.temporary)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def read_index(path: str) -> List[ArchiveBlock]:
+    with open(path, "rb") as file:
+        file.seek(-FOOTER.size, os.SEEK_END)
+        count, magic = FOOTER.unpack(file.read(FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a polymer archive")
+        file.seek(-FOOTER.size - count * INDEX_ENTRY.size, os.SEEK_END)
+        entries = file.read(count * INDEX_ENTRY.size)
+    return [
+        ArchiveBlock(path, offset, size, rows, _time(first), _time(last))
+        for first, last, offset, size, rows in INDEX_ENTRY.iter_unpack(entries)
+    ]
+
+def merge_sorted(*sources: Iterable) -> Iterator:
+    """
+    Merge timestamp-sorted sources into one, keeping only the first record
+    for a timestamp. Timestamps are unique, so an equal one is the same
+    record; pass the SQLite rows first to prefer them.
+    """
+    previous = None
+    for record in heapq.merge(*sources, key=lambda record: naive_timestamp(record.timestamp)):
+        timestamp = naive_timestamp(record.timestamp)
+        if timestamp != previous:
+            previous = timestamp
+            yield record
+
+class RecordArchive:
+    """
+    Block index over every archive file in a directory.
+
+    The index is rebuilt whenever the directory changes, so files written by
+    an archival run in another process are picked up on the next read.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._version = None
+        # Blocks ordered by first timestamp, those first timestamps, and the
+        # last archived timestamp
+        self._snapshot: Tuple[List[ArchiveBlock], List[datetime], Optional[datetime]] = ([], [], None)
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            return settings.archive_dir
+        return self._directory
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def writer(self) -> ArchiveWriter:
+        return ArchiveWriter(self.directory)
+
+    def snapshot(self) -> Tuple[List[ArchiveBlock], List[datetime], Optional[datetime]]:
+        directory = self.directory
+        try:
+            version = (directory, os.stat(directory).st_mtime_ns)
+        except FileNotFoundError:
+            version = (directory, None)
+        with self._lock:
+            if version != self._version:
+                blocks = []
+                if version[1] is not None:
+                    for entry in os.scandir(directory):
+                        if entry.name.endswith(SUFFIX):
+                            blocks.extend(read_index(entry.path))
+                blocks.sort(key=lambda block: block.first)
+                self._snapshot = (
+                    blocks,
+                    [block.first for block in blocks],
+                    max((block.last for block in blocks), default=None)
+                )
+                self._version = version
+            return self._snapshot
+
+    def blocks(self) -> List[ArchiveBlock]:
+        """
+        Every archived block, ordered by first timestamp.
+        """
+        return self.snapshot()[0]
+
+    def _overlapping(self, start: Optional[datetime], end: Optional[datetime]) -> List[ArchiveBlock]:
+        blocks, firsts, _ = self.snapshot()
+        stop = len(blocks) if end is None else bisect_right(firsts, end)
+        return [block for block in blocks[:stop] if start is None or block.last >= start]
+
+    def records(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[ArchivedRecord]:
+        """
+        Archived records in [start, end] in timestamp order, reading only
+        the blocks that overlap it.
+        """
+        start = naive_timestamp(start) if start is not None else None
+        end = naive_timestamp(end) if end is not None else None
+        blocks = self._overlapping(start, end)
+
+        sources = []
+        for block in blocks:
+            timestamps, records = read_block(block.path, block.offset, block.size)
+            low = 0 if start is None else bisect_left(timestamps, start)
+            high = len(records) if end is None else bisect_right(timestamps, end)
+            sources.append(records[low:high])
+
+        # Blocks written by successive runs usually follow each other
+        if all(previous.last < block.first for previous, block in zip(blocks, blocks[1:])):
+            return chain.from_iterable(sources)
+        return merge_sorted(*sources)
+
+    def existing_timestamps(self, timestamps: Iterable[datetime]) -> List[datetime]:
+        """
+        The given timestamps that are already archived.
+        """
+        last = self.snapshot()[2]
+        existing = []
+        for timestamp in timestamps:
+            timestamp = naive_timestamp(timestamp)
+            # New records are nearly always newer than everything archived
+            if last is None or timestamp > last:
+                continue
+            for block in self._overlapping(timestamp, timestamp):
+                block_timestamps, _ = read_block(block.path, block.offset, block.size)
+                position = bisect_left(block_timestamps, timestamp)
+                if position < len(block_timestamps) and block_timestamps[position] == timestamp:
+                    existing.append(timestamp)
+        return existing
+
+# Archive shared by every repository in the process
+record_archive = RecordArchive()
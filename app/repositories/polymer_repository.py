@@ -1,44 +1,259 @@
+from anyio import to_thread
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, and_, delete, false, func, insert, or_, select, text
+import time
 from datetime import datetime
-from typing import List, Optional
+from itertools import islice
+from string import ascii_lowercase, ascii_uppercase
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 
-from app.models.database import PolymerRecord
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import naive_timestamp
+from app.models import partitions
+from app.models.database import PolymerRecord, trigram_index_enabled
 from app.models.schemas import PolymerCreate
+from app.repositories.archive import ArchivedRecord, merge_sorted, record_archive
+from app.services.polymer_service import segment_columns
+
+# Blocks per archive file; each file is committed as one transaction
+ARCHIVE_FILE_BLOCKS = 64
+# Share of sqlite_busy_timeout_ms one archive transaction may hold the write
+# lock for, so ingests waiting on it don't time out
+ARCHIVE_LOCK_SHARE = 0.25
+# Pause between archive transactions; SQLite's busy handler retries a
+# waiting writer at most 100 ms apart, so it gets the lock in between
+ARCHIVE_PAUSE_SECONDS = 0.15
+
+# SQLite's lower() only folds ASCII letters
+_ASCII_LOWER = str.maketrans(ascii_uppercase, ascii_lowercase)
+
+# Callbacks run with the newly committed records after every ingest
+_ingest_listeners: List[Callable[[List[PolymerRecord]], None]] = []
+
+def add_ingest_listener(listener: Callable[[List[PolymerRecord]], None]) -> None:
+    """
+    Register a callback to be told about records as they are ingested.
+    """
+    _ingest_listeners.append(listener)
 
 class PolymerRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, polymer: PolymerCreate) -> PolymerRecord:
+    @metrics.timed("ingest")
+    def create(self, polymer: PolymerCreate, segments: Optional[Dict[str, Any]] = None) -> PolymerRecord:
+        if segments is None:
+            segments = segment_columns(polymer.polymer)
+        if settings.partitioned_storage:
+            return self._create_many([polymer], [segments])[0]
+        
         # Check for duplicate timestamp
         existing = self.db.query(PolymerRecord).filter(
             PolymerRecord.timestamp == polymer.timestamp
         ).first()
+        if existing is None and record_archive.enabled:
+            existing = record_archive.existing_timestamps([polymer.timestamp])
         
         if existing:
             raise ValueError(f"Polymer already exists for timestamp {polymer.timestamp}")
         
         db_polymer = PolymerRecord(
             timestamp=polymer.timestamp,
-            polymer=polymer.polymer
+            polymer=polymer.polymer,
+            length=len(polymer.polymer),
+            **segments
         )
         
         self.db.add(db_polymer)
+        self.db.flush()
+        self._index_substrings([db_polymer])
         self.db.commit()
         self.db.refresh(db_polymer)
+        self._notify_ingested([db_polymer])
         return db_polymer
     
+    @metrics.timed("ingest")
+    def create_many(
+        self, polymers: List[PolymerCreate], segments: Optional[List[Dict[str, Any]]] = None
+    ) -> List[PolymerRecord]:
+        """
+        Ingest a batch of polymers in one transaction.
+        
+        Duplicate timestamps are checked with a few IN queries up front and
+        the rows go in as one multi-row INSERT ... RETURNING, so nothing is
+        written unless the whole batch is valid. segments holds each
+        polymer's segment_columns when the caller computed them already.
+        """
+        return self._create_many(polymers, segments)
+    
+    def _create_many(
+        self, polymers: List[PolymerCreate], segments: Optional[List[Dict[str, Any]]] = None
+    ) -> List[PolymerRecord]:
+        if not polymers:
+            return []
+        
+        seen = set()
+        for polymer in polymers:
+            if polymer.timestamp in seen:
+                raise ValueError(f"Duplicate timestamp {polymer.timestamp} in batch")
+            seen.add(polymer.timestamp)
+        
+        existing = self._existing_timestamps([polymer.timestamp for polymer in polymers])
+        if existing:
+            raise ValueError(f"Polymer already exists for timestamp {min(existing)}")
+        
+        if segments is None:
+            segments = [segment_columns(polymer.polymer) for polymer in polymers]
+        rows = []
+        for polymer, columns in zip(polymers, segments):
+            rows.append({
+                "timestamp": polymer.timestamp,
+                "polymer": polymer.polymer,
+                "length": len(polymer.polymer),
+                **columns
+            })
+        
+        try:
+            if settings.partitioned_storage:
+                records = self._insert_partitioned(rows)
+            else:
+                records = list(self.db.scalars(
+                    insert(PolymerRecord).returning(PolymerRecord, sort_by_parameter_order=True), rows
+                ))
+                self._index_substrings(records)
+            # RETURNING already loaded every column, so skip the reload on commit
+            expire_on_commit = self.db.expire_on_commit
+            self.db.expire_on_commit = False
+            try:
+                self.db.commit()
+            finally:
+                self.db.expire_on_commit = expire_on_commit
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        self._notify_ingested(records)
+        return records
+    
+    def _insert_partitioned(self, rows: List[dict]) -> List[PolymerRecord]:
+        """
+        Insert rows into the partitions of their months, creating those
+        that don't exist yet. Records come back in the order of the rows.
+        """
+        by_partition: Dict[str, List[int]] = {}
+        for position, row in enumerate(rows):
+            by_partition.setdefault(partitions.partition_name(row["timestamp"]), []).append(position)
+        
+        connection = self.db.connection()
+        existing = set(partitions.list_partitions(connection))
+        records: List[Optional[PolymerRecord]] = [None] * len(rows)
+        for name, positions in by_partition.items():
+            if name not in existing:
+                partitions.create_partition(connection, name)
+            table = partitions.partition_table(name)
+            inserted = self.db.execute(
+                insert(table).returning(*table.c, sort_by_parameter_order=True),
+                [rows[position] for position in positions]
+            )
+            group = [PolymerRecord(**row._mapping) for row in inserted]
+            self._index_substrings(group, name)
+            for position, record in zip(positions, group):
+                records[position] = record
+        return records
+    
+    def _index_substrings(self, records: List[PolymerRecord], table: str = PolymerRecord.__tablename__) -> None:
+        # Keep the trigram index in the same transaction as the rows
+        if trigram_index_enabled():
+            trigram_table = partitions.trigram_table(table)
+            self.db.execute(
+                text(f"INSERT INTO {trigram_table} (rowid, polymer) VALUES (:id, :polymer)"),
+                [{"id": record.id, "polymer": record.polymer} for record in records]
+            )
+    
+    def _existing_timestamps(self, timestamps: List[datetime], chunk_size: int = 500) -> List[datetime]:
+        by_entity = [(PolymerRecord, timestamps)]
+        if settings.partitioned_storage:
+            existing_partitions = set(partitions.list_partitions(self.db))
+            grouped: Dict[str, List[datetime]] = {}
+            for timestamp in timestamps:
+                grouped.setdefault(partitions.partition_name(timestamp), []).append(timestamp)
+            by_entity = [
+                (partitions.partition_entity(name), group)
+                for name, group in grouped.items() if name in existing_partitions
+            ]
+        
+        # Chunked to stay well under SQLite's bound parameter limit
+        existing = []
+        for entity, group in by_entity:
+            for i in range(0, len(group), chunk_size):
+                existing.extend(self.db.scalars(
+                    select(entity.timestamp).where(entity.timestamp.in_(group[i:i + chunk_size]))
+                ))
+        if record_archive.enabled:
+            existing.extend(record_archive.existing_timestamps(timestamps))
+        return existing
+    
+    def _tables(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Tuple[Any, str]]:
+        """
+        (entity, table name) of every table holding records in [start, end],
+        oldest first. Without partitioning that is just polymer_records.
+        """
+        if not settings.partitioned_storage:
+            return [(PolymerRecord, PolymerRecord.__tablename__)]
+        names = partitions.overlapping(partitions.list_partitions(self.db), start, end)
+        return [(partitions.partition_entity(name), name) for name in names]
+    
+    @metrics.timed("query", count_rows=True)
     def get_by_time_range(
         self, 
         start: datetime, 
         end: datetime
     ) -> List[PolymerRecord]:
-        return self.db.query(PolymerRecord).filter(
-            PolymerRecord.timestamp >= start,
-            PolymerRecord.timestamp <= end
-        ).order_by(PolymerRecord.timestamp).all()
+        records = []
+        for entity, _ in self._tables(start, end):
+            records.extend(self.db.query(entity).filter(
+                entity.timestamp >= start,
+                entity.timestamp <= end
+            ).order_by(entity.timestamp))
+        if record_archive.enabled:
+            records = self._records(merge_sorted(records, record_archive.records(start, end)))
+        return records
     
+    def iter_segments_by_time_range(
+        self,
+        start: datetime,
+        end: datetime,
+        batch_size: int = 1000
+    ) -> Iterator[Tuple[str, Optional[str], Optional[int]]]:
+        """
+        Stream (polymer, reduced, reaction_count) rows in timestamp order.
+        
+        Rows are fetched in batches without building ORM objects, so memory
+        does not grow with the size of the range.
+        """
+        rows = self._iter_segment_rows(start, end, batch_size)
+        if record_archive.enabled:
+            rows = merge_sorted(rows, record_archive.records(start, end))
+        
+        for row in rows:
+            yield row.polymer, row.reduced, row.reaction_count
+    
+    def _iter_segment_rows(self, start: datetime, end: datetime, batch_size: int) -> Iterator[Row]:
+        for entity, _ in self._tables(start, end):
+            query = select(
+                entity.timestamp,
+                entity.polymer,
+                entity.reduced,
+                entity.reaction_count
+            ).where(
+                entity.timestamp >= start,
+                entity.timestamp <= end
+            ).order_by(entity.timestamp).execution_options(yield_per=batch_size)
+            yield from self.db.execute(query)
+    
+    @metrics.timed("query", count_rows=True)
     def get_by_time_range_with_filters(
         self, 
         start: datetime, 
@@ -46,39 +261,338 @@ class PolymerRepository:
         length_gt: Optional[int] = None,
         length_lt: Optional[int] = None,
         substring: Optional[str] = None,
-        case_sensitive: bool = True  # New parameter
+        case_sensitive: bool = True,  # New parameter
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None
     ) -> List[PolymerRecord]:
         """
         Retrieve polymers with optional filters.
+        
+        Pages are keyset-based: pass the (timestamp, id) of the last record
+        of the previous page as `after`, so every page is an index seek.
         """
-        query = self.db.query(PolymerRecord).filter(
-            PolymerRecord.timestamp >= start,
-            PolymerRecord.timestamp <= end
+        return self._records(self._filtered(
+            lambda entity: [entity], start, end, length_gt, length_lt,
+            substring, case_sensitive, limit, after
+        ))
+    
+    @metrics.timed("query", count_rows=True)
+    def get_rows_by_time_range_with_filters(
+        self,
+        start: datetime,
+        end: datetime,
+        length_gt: Optional[int] = None,
+        length_lt: Optional[int] = None,
+        substring: Optional[str] = None,
+        case_sensitive: bool = True,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """
+        Same query as get_by_time_range_with_filters, returning only
+        (id, timestamp, polymer) rows instead of full ORM entities.
+        """
+        return self._filtered(
+            lambda entity: [entity.id, entity.timestamp, entity.polymer],
+            start, end, length_gt, length_lt, substring, case_sensitive, limit, after
         )
     
+    def _filtered(
+        self,
+        columns: Callable[[Any], list],
+        start: datetime,
+        end: datetime,
+        length_gt: Optional[int],
+        length_lt: Optional[int],
+        substring: Optional[str],
+        case_sensitive: bool,
+        limit: Optional[int],
+        after: Optional[Tuple[datetime, int]]
+    ):
+        lower_bound = start
+        if after is not None:
+            # Start the index range at the cursor rather than at `start`
+            lower_bound = max(naive_timestamp(start), naive_timestamp(after[0]))
+        
+        # Partitions hold disjoint months, so reading them in order keeps
+        # the (timestamp, id) order and the limit can stop early
+        results = []
+        for entity, table in self._tables(lower_bound, end):
+            remaining = None if limit is None else limit - len(results)
+            results.extend(self._filtered_query(
+                entity, table, columns(entity), lower_bound, end, length_gt, length_lt,
+                substring, case_sensitive, remaining, after
+            ))
+            if limit is not None and len(results) >= limit:
+                break
+        
+        if record_archive.enabled:
+            archived = self._filtered_archive(
+                lower_bound, end, length_gt, length_lt, substring, case_sensitive, after
+            )
+            results = list(islice(merge_sorted(results, archived), limit))
+        return results
+    
+    def _filtered_archive(
+        self,
+        lower_bound: datetime,
+        end: datetime,
+        length_gt: Optional[int],
+        length_lt: Optional[int],
+        substring: Optional[str],
+        case_sensitive: bool,
+        after: Optional[Tuple[datetime, int]]
+    ) -> Iterator[ArchivedRecord]:
+        """
+        The archived records _filtered_query would match, evaluated in Python.
+        
+        Substrings match literally, like instr(); without case_sensitive both
+        sides are lowered on ASCII letters only, like SQLite's lower().
+        """
+        if after is not None:
+            after = (naive_timestamp(after[0]), after[1])
+        if substring is not None and not case_sensitive:
+            substring = substring.translate(_ASCII_LOWER)
+        
+        for record in record_archive.records(lower_bound, end):
+            if after is not None and (record.timestamp, record.id) <= after:
+                continue
+            if length_gt is not None and record.length <= length_gt:
+                continue
+            if length_lt is not None and record.length >= length_lt:
+                continue
+            if substring is not None:
+                polymer = record.polymer if case_sensitive else record.polymer.translate(_ASCII_LOWER)
+                if substring not in polymer:
+                    continue
+            yield record
+    
+    def _filtered_query(
+        self,
+        entity: Any,
+        table: str,
+        entities: list,
+        lower_bound: datetime,
+        end: datetime,
+        length_gt: Optional[int],
+        length_lt: Optional[int],
+        substring: Optional[str],
+        case_sensitive: bool,
+        limit: Optional[int],
+        after: Optional[Tuple[datetime, int]]
+    ):
+        query = self.db.query(*entities).filter(
+            entity.timestamp >= lower_bound,
+            entity.timestamp <= end
+        )
+        
+        if after is not None:
+            after_timestamp, after_id = after
+            query = query.filter(or_(
+                entity.timestamp > after_timestamp,
+                and_(entity.timestamp == after_timestamp, entity.id > after_id)
+            ))
+    
         # Apply length filters
         if length_gt is not None:
-            query = query.filter(
-                func.length(PolymerRecord.polymer) > length_gt
-            )
+            query = query.filter(entity.length > length_gt)
     
         if length_lt is not None:
-            query = query.filter(
-                func.length(PolymerRecord.polymer) < length_lt
-            )
+            query = query.filter(entity.length < length_lt)
     
         # Apply substring filter
         if substring is not None:
+            # The trigram index narrows the candidates, ignoring case; the
+            # instr() below decides the exact match, so results don't depend
+            # on the index
+            if len(substring) >= 3 and trigram_index_enabled():
+                trigram_table = partitions.trigram_table(table)
+                query = query.filter(text(
+                    f"{table}.id IN (SELECT rowid FROM {trigram_table} "
+                    f"WHERE {trigram_table} MATCH :trigram_pattern)"
+                ).bindparams(trigram_pattern='"' + substring.replace('"', '""') + '"'))
+
+            # instr() matches the substring literally; SQLite's LIKE would
+            # ignore ASCII case and treat % and _ as wildcards
             if case_sensitive:
                 query = query.filter(
-                    PolymerRecord.polymer.contains(substring)
+                    func.instr(entity.polymer, substring) > 0
                 )
             else:
                 query = query.filter(
-                    PolymerRecord.polymer.ilike(f"%{substring}%")
+                    func.instr(func.lower(entity.polymer), func.lower(substring)) > 0
                 )
     
-        return query.order_by(PolymerRecord.timestamp).all()
+        query = query.order_by(entity.timestamp)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+    
+    def _records(self, records: Iterable) -> List[PolymerRecord]:
+        # Archived records are handed out as detached PolymerRecords
+        return [
+            PolymerRecord(**record._asdict(), length=record.length)
+            if isinstance(record, ArchivedRecord) else record
+            for record in records
+        ]
+    
+    def archive_before(self, cutoff: datetime, block_rows: Optional[int] = None) -> int:
+        """
+        Move records older than cutoff out of SQLite into the archive.
+        
+        Each archive file is published before the transaction deleting its
+        rows commits, so a record is never missing from both tiers. That
+        transaction holds SQLite's write lock from before its first read,
+        so no ingest lands between reading a block and deleting it. A file
+        is closed and committed after ARCHIVE_FILE_BLOCKS blocks, or sooner
+        once the lock has been held for ARCHIVE_LOCK_SHARE of the busy
+        timeout, so ingests meanwhile wait instead of failing. Partitions whose whole month was archived are dropped in the same
+        transaction; the space of other tables is reused, or returned by a
+        VACUUM.
+        
+        Returns:
+            int: Number of records archived
+        """
+        block_rows = block_rows or settings.archive_block_rows
+        archived = 0
+        for entity, table in self._tables(None, cutoff):
+            whole_partition = settings.partitioned_storage and partitions.partition_bounds(table)[1] <= cutoff
+            while True:
+                blocks = 0
+                finished = False
+                try:
+                    self._lock_for_writing(entity)
+                    deadline = time.monotonic() + settings.sqlite_busy_timeout_ms / 1000 * ARCHIVE_LOCK_SHARE
+                    with record_archive.writer() as writer:
+                        # Every file takes at least one block, however short the timeout
+                        while blocks == 0 or (blocks < ARCHIVE_FILE_BLOCKS and time.monotonic() < deadline):
+                            rows = self.db.execute(
+                                select(
+                                    entity.id, entity.timestamp, entity.polymer, entity.reduced,
+                                    entity.reaction_count, entity.created_at
+                                ).where(entity.timestamp < cutoff).order_by(entity.timestamp).limit(block_rows)
+                            ).all()
+                            if not rows:
+                                finished = True
+                                break
+                            writer.write_block(rows)
+                            self._delete_archived(entity, table, rows)
+                            blocks += 1
+                            archived += len(rows)
+                    if finished and whole_partition:
+                        # Still under the lock taken before the empty read
+                        partitions.drop_partition(self.db.connection(), table)
+                    self.db.commit()
+                except Exception:
+                    self.db.rollback()
+                    raise
+                if finished:
+                    break
+                time.sleep(ARCHIVE_PAUSE_SECONDS)
+            
+            if not whole_partition and trigram_index_enabled():
+                # Deletes only mark trigram entries; merging the index frees their pages
+                trigram_table = partitions.trigram_table(table)
+                self.db.execute(text(f"INSERT INTO {trigram_table} ({trigram_table}) VALUES ('optimize')"))
+                self.db.commit()
+        return archived
+    
+    def _lock_for_writing(self, entity: Any) -> None:
+        # The driver only opens a transaction at the first write; a delete
+        # that matches nothing takes SQLite's write lock right away
+        self.db.execute(delete(entity).where(false()), execution_options={"synchronize_session": False})
+    
+    def _delete_archived(self, entity: Any, table: str, rows: List[Row]) -> None:
+        # Rows are the oldest in the table, so everything up to the last goes
+        if trigram_index_enabled():
+            trigram_table = partitions.trigram_table(table)
+            self.db.execute(
+                text(
+                    f"INSERT INTO {trigram_table} ({trigram_table}, rowid, polymer) "
+                    "VALUES ('delete', :id, :polymer)"
+                ),
+                [{"id": row.id, "polymer": row.polymer} for row in rows]
+            )
+        self.db.execute(
+            delete(entity).where(entity.timestamp <= rows[-1].timestamp),
+            execution_options={"synchronize_session": False}
+        )
+    
+    def _notify_ingested(self, records: List[PolymerRecord]) -> None:
+        for listener in _ingest_listeners:
+            listener(records)
     
+    @metrics.timed("query", count_rows=True)
     def get_all_polymers(self) -> List[PolymerRecord]:
-        return self.db.query(PolymerRecord).order_by(PolymerRecord.timestamp).all()
\ No newline at end of file
+        records = []
+        for entity, _ in self._tables():
+            records.extend(self.db.query(entity).order_by(entity.timestamp))
+        if record_archive.enabled:
+            records = self._records(merge_sorted(records, record_archive.records()))
+        return records
+    
+    def ping(self) -> None:
+        self.db.execute(text("SELECT 1"))
+
+T = TypeVar("T")
+
+class AsyncPolymerRepository:
+    """
+    Awaitable front for PolymerRepository.
+    
+    With an AsyncSession the repository runs on the async driver through
+    run_sync; with a regular Session it runs in a worker thread. Either
+    way the event loop is never blocked on the database. Every
+    PolymerRepository method is available as a coroutine.
+    
+    run_sync executes on the event loop thread, so CPU-heavy work must not
+    go through run with an AsyncSession: ingest computes segment columns in
+    a worker thread first, and iter_batches hands rows over in batches for
+    the caller to process off the loop.
+    """
+    
+    def __init__(self, db: Union[Session, AsyncSession]):
+        self.db = db
+    
+    async def run(self, work: Callable[[PolymerRepository], T]) -> T:
+        """
+        Run several repository calls as one unit off the event loop.
+        """
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(lambda session: work(PolymerRepository(session)))
+        return await to_thread.run_sync(work, PolymerRepository(self.db))
+    
+    async def iter_batches(
+        self, work: Callable[[PolymerRepository], Iterator[T]], batch_size: int = 1000
+    ) -> AsyncIterator[List[T]]:
+        """
+        Read an iterator built from the repository in batches, each one as
+        a unit off the event loop (see run).
+        """
+        iterator = await self.run(work)
+        try:
+            while True:
+                batch = await self.run(lambda repository: list(islice(iterator, batch_size)))
+                if not batch:
+                    return
+                yield batch
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await self.run(lambda repository: close())
+    
+    async def create(self, polymer: PolymerCreate) -> PolymerRecord:
+        segments = await to_thread.run_sync(segment_columns, polymer.polymer)
+        return await self.run(lambda repository: repository.create(polymer, segments))
+    
+    async def create_many(self, polymers: List[PolymerCreate]) -> List[PolymerRecord]:
+        segments = await to_thread.run_sync(lambda: [segment_columns(polymer.polymer) for polymer in polymers])
+        return await self.run(lambda repository: repository.create_many(polymers, segments))
+    
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(PolymerRepository, name)
+        
+        async def call(*args, **kwargs):
+            return await self.run(lambda repository: method(repository, *args, **kwargs))
+        
+        return call
\ No newline at end of file
@@ -0,0 +1,189 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.database import naive_timestamp
+from app.models.database import PolymerRecord
+from app.repositories.polymer_repository import add_ingest_listener
+from app.services.polymer_service import merge_reduced, record_segment
+from app.services.reaction_rules import DEFAULT_RULES, ReactionRules
+
+Segment = Tuple[str, int]
+
+EMPTY_SEGMENT: Segment = ("", 0)
+
+def _combine(left: Segment, right: Segment, rules: ReactionRules = DEFAULT_RULES) -> Segment:
+    merged, boundary_reactions = merge_reduced(left[0], right[0], rules)
+    return merged, left[1] + right[1] + boundary_reactions
+
+class ReactorIndex:
+    """
+    Segment tree over reduced polymer segments in timestamp order.
+
+    Every node holds the stable polymer and reaction count of its subtree, so
+    any [start, end] window is answered by combining O(log n) nodes.
+    Records appended in timestamp order update the tree in place; an
+    out-of-order record marks it for a rebuild on the next query.
+    """
+
+    def __init__(self, rules: Optional[ReactionRules] = None):
+        self.rules = rules or DEFAULT_RULES
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Drop all indexed segments; the index reloads on next use.
+        """
+        self._timestamps: List[datetime] = []
+        self._segments: List[Segment] = []
+        self._tree: List[Segment] = []
+        self._capacity = 0
+        self._stale = False
+        # Records ingested while a load reads its records, see begin_load
+        self._pending: Optional[List[Tuple[datetime, Segment]]] = None
+        self.loaded = False
+
+    def begin_load(self) -> None:
+        """
+        Start keeping ingested records for load(); call it before reading
+        the records to load, so one committed while they are read isn't lost.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+
+    def load(self, records: Iterable[PolymerRecord]) -> None:
+        """
+        Build the index from records given in timestamp order, plus those
+        ingested since begin_load. A loaded index is already kept current
+        by ingests, so a second load leaves it as it is.
+        """
+        records = list(records)
+        with self._lock:
+            if self.loaded:
+                return
+            self._timestamps = [naive_timestamp(record.timestamp) for record in records]
+            self._segments = [record_segment(record, self.rules) for record in records]
+            self._rebuild()
+            loaded = set(self._timestamps)
+            for timestamp, segment in self._pending or ():
+                if timestamp not in loaded:
+                    self._add(timestamp, segment)
+            self._pending = None
+            self.loaded = True
+
+    def add(self, timestamp: datetime, segment: Segment) -> None:
+        """
+        Index one more reduced segment.
+        """
+        with self._lock:
+            self._add(naive_timestamp(timestamp), segment)
+
+    def on_ingest(self, records: List[PolymerRecord]) -> None:
+        # Only keep an index current once something has started loading it
+        if not self.loaded and self._pending is None:
+            return
+        entries = [(naive_timestamp(record.timestamp), record_segment(record, self.rules)) for record in records]
+        with self._lock:
+            if self.loaded:
+                for timestamp, segment in entries:
+                    self._add(timestamp, segment)
+            elif self._pending is not None:
+                self._pending.extend(entries)
+
+    @metrics.timed("react")
+    def query(self, start: datetime, end: datetime) -> Segment:
+        """
+        Return (stable_polymer, reaction_count) for records in [start, end].
+        """
+        with self._lock:
+            if self._stale:
+                self._rebuild()
+
+            low = bisect_left(self._timestamps, naive_timestamp(start))
+            high = bisect_right(self._timestamps, naive_timestamp(end))
+
+            left_result = EMPTY_SEGMENT
+            right_result = EMPTY_SEGMENT
+            low += self._capacity
+            high += self._capacity
+
+            while low < high:
+                if low & 1:
+                    left_result = _combine(left_result, self._tree[low], self.rules)
+                    low += 1
+                if high & 1:
+                    high -= 1
+                    right_result = _combine(self._tree[high], right_result, self.rules)
+                low >>= 1
+                high >>= 1
+
+            return _combine(left_result, right_result, self.rules)
+
+    def _add(self, timestamp: datetime, segment: Segment) -> None:
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            position = bisect_left(self._timestamps, timestamp)
+            self._timestamps.insert(position, timestamp)
+            self._segments.insert(position, segment)
+            self._stale = True
+            return
+
+        self._timestamps.append(timestamp)
+        self._segments.append(segment)
+        if self._stale or len(self._segments) > self._capacity:
+            self._stale = True
+            return
+        self._update(len(self._segments) - 1, segment)
+
+    def _rebuild(self) -> None:
+        capacity = 1
+        while capacity < len(self._segments):
+            capacity <<= 1
+
+        self._capacity = capacity
+        self._tree = [EMPTY_SEGMENT] * (2 * capacity)
+        self._tree[capacity:capacity + len(self._segments)] = self._segments
+        for node in range(capacity - 1, 0, -1):
+            self._tree[node] = _combine(self._tree[2 * node], self._tree[2 * node + 1], self.rules)
+        self._stale = False
+
+    def _update(self, position: int, segment: Segment) -> None:
+        node = position + self._capacity
+        self._tree[node] = segment
+        node >>= 1
+        while node:
+            self._tree[node] = _combine(self._tree[2 * node], self._tree[2 * node + 1], self.rules)
+            node >>= 1
+
+@metrics.timed("react")
+def react_windows(
+    records: Iterable[PolymerRecord],
+    windows: List[Tuple[datetime, datetime]],
+    rules: Optional[ReactionRules] = None
+) -> List[Segment]:
+    """
+    React several time windows over one pass of records.
+
+    The records covering all windows are indexed once, so each window costs
+    O(log n) segment merges instead of a fresh scan and reaction.
+
+    Args:
+        records: Records spanning every window, in timestamp order
+        windows: (start, end) pairs
+        rules: Reaction rules, polarity by default
+
+    Returns:
+        list: (stable_polymer, reaction_count) per window, in request order
+    """
+    records = list(records)
+    metrics.add_monomers(sum(len(record.polymer) for record in records))
+    index = ReactorIndex(rules)
+    index.load(records)
+    return [index.query(start, end) for start, end in windows]
+
+# Process-wide index shared by all requests
+reactor_index = ReactorIndex()
+add_ingest_listener(reactor_index.on_ingest)
@@ -0,0 +1,84 @@
+"""
+Compact 6-bit encoding of ASCII-letter polymers.
+
+Each monomer becomes a 6-bit code: the letter's position times two, plus one
+for upper case. The engine on codes looks partners up in a table translated
+from a rule set's byte partners, like the other engines.
+
+Older releases could store reduced segments packed four codes to every three
+bytes, a short final group padded with PAD; pack and unpack convert that
+form. Base64 packs the same 6-bit groups, so both are a table translation
+plus a base64 call and never loop in Python.
+"""
+import base64
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from app.services.reaction_rules import DEFAULT_RULES, ReactionRules
+
+MONOMER_BITS = 6
+PAD = 0x3F
+
+_LETTERS = bytes(
+    code for pair in zip(range(ord("a"), ord("z") + 1), range(ord("A"), ord("Z") + 1))
+    for code in pair
+)
+# Base64 digit for every 6-bit value, in order
+_DIGITS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_PAD_DIGIT = _DIGITS[PAD:PAD + 1]
+
+ENCODE_TABLE = bytes.maketrans(_LETTERS, bytes(range(len(_LETTERS))))
+DECODE_TABLE = bytes.maketrans(bytes(range(len(_LETTERS))), _LETTERS)
+_LETTERS_TO_DIGITS = bytes.maketrans(_LETTERS, _DIGITS[:len(_LETTERS)])
+_DIGITS_TO_LETTERS = bytes.maketrans(_DIGITS[:len(_LETTERS)], _LETTERS)
+
+def encode_codes(polymer: str) -> bytearray:
+    """
+    Convert a polymer to one 6-bit code per byte.
+    """
+    return bytearray(polymer.encode("ascii").translate(ENCODE_TABLE))
+
+def decode_codes(codes) -> str:
+    return bytes(codes).translate(DECODE_TABLE).decode("ascii")
+
+def pack(polymer: str) -> bytes:
+    """
+    Pack an ASCII-letter polymer at 6 bits per monomer.
+    """
+    digits = polymer.encode("ascii").translate(_LETTERS_TO_DIGITS)
+    return base64.b64decode(digits + _PAD_DIGIT * (-len(digits) % 4))
+
+def unpack(data) -> str:
+    return base64.b64encode(data).rstrip(_PAD_DIGIT).translate(_DIGITS_TO_LETTERS).decode("ascii")
+
+@lru_cache(maxsize=64)
+def code_partners(rules: ReactionRules = DEFAULT_RULES) -> List[Optional[int]]:
+    """
+    Partner code of each 6-bit code under a rule set, or None where it never reacts.
+    """
+    partners: List[Optional[int]] = [None] * (PAD + 1)
+    for code, letter in enumerate(_LETTERS):
+        partner = rules.byte_partners[letter]
+        if partner is not None and partner in _LETTERS:
+            partners[code] = ENCODE_TABLE[partner]
+    return partners
+
+def react_codes(codes, rules: Optional[ReactionRules] = None) -> Tuple[bytearray, int]:
+    """
+    React a buffer of 6-bit codes on a byte stack.
+
+    Returns:
+        tuple: (surviving_codes, reaction_count)
+    """
+    stack = bytearray()
+    reaction_count = 0
+    partners = code_partners(rules or DEFAULT_RULES)
+
+    for code in codes:
+        if stack and stack[-1] == partners[code]:
+            stack.pop()
+            reaction_count += 1
+        else:
+            stack.append(code)
+
+    return stack, reaction_count
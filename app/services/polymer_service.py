@@ -1,22 +1,45 @@
-def react_polymer(polymer: str) -> tuple[str, int]:
+import multiprocessing
+import threading
+from collections import Counter
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.reaction_rules import DEFAULT_RULES, ReactionRules, append_reduced
+from app.services.vectorized_reactor import react_polymer_vectorized, vectorized_available
+
+def react_polymer(polymer: str, rules: Optional[ReactionRules] = None) -> tuple[str, int]:
     """
     Process polymer chain reaction and return stable polymer + reaction count.
     Uses a stack-based approach that handles all reactions in one pass.
+    Large ASCII polymers go to the NumPy engine when it is installed.
     
     Args:
         polymer: Input polymer string
+        rules: Reaction rules, polarity by default
         
     Returns:
         tuple: (stable_polymer, reaction_count)
     """
     if not polymer:
         return "", 0
+    
+    rules = rules or DEFAULT_RULES
+    if (
+        len(polymer) >= settings.vectorized_reaction_threshold
+        and vectorized_available()
+        and polymer.isascii()
+    ):
+        return react_polymer_vectorized(polymer, rules.byte_partners)
         
     stack = []
     reaction_count = 0
+    partners = rules.partners
     
     for char in polymer:
-        if stack and will_react(stack[-1], char):
+        if stack and stack[-1] == partners[char]:
             # Reaction occurs - remove the top of stack
             stack.pop()
             reaction_count += 1
@@ -25,19 +48,24 @@ def react_polymer(polymer: str) -> tuple[str, int]:
     
     return ''.join(stack), reaction_count
 
-def will_react(a: str, b: str) -> bool:
+def will_react(a: str, b: str, rules: Optional[ReactionRules] = None) -> bool:
     """
     Check if two monomers will react.
-    They react if they are the same letter but different cases.
+    By default they react if they are the same letter but different cases.
     """
-    return a != b and a.lower() == b.lower()
+    return (rules or DEFAULT_RULES).partners[b] == a
 
-def process_multiple_polymers(polymers: list) -> tuple[str, int]:
+def process_multiple_polymers(
+    polymers: list, parallel: bool = False, rules: Optional[ReactionRules] = None
+) -> tuple[str, int]:
     """
     Process multiple polymers by concatenating and reacting.
     
     Args:
         polymers: List of polymer strings
+        parallel: Split the combined polymer into one chunk per worker,
+            react the chunks in the process pool and merge them in order
+        rules: Reaction rules, polarity by default
         
     Returns:
         tuple: (final_polymer, total_reaction_count)
@@ -48,7 +76,376 @@ def process_multiple_polymers(polymers: list) -> tuple[str, int]:
     # Concatenate all polymers
     combined = ''.join(polymers)
     
+    if parallel and settings.reactor_workers > 1:
+        chunk_size = -(-len(combined) // settings.reactor_workers)
+        chunks = [combined[i:i + chunk_size] for i in range(0, len(combined), chunk_size)]
+        return merge_in_order(get_reaction_pool().map(react_polymer, chunks, repeat(rules)), rules)
+    
     # React the combined polymer
-    result, reaction_count = react_polymer(combined)
+    result, reaction_count = react_polymer(combined, rules)
+    
+    return result, reaction_count
+
+@metrics.timed("react")
+def react_sliding_windows(entries, start, end, width, step, rules: Optional[ReactionRules] = None) -> list:
+    """
+    React a rolling window of width `width` moved forward by `step`.
     
-    return result, reaction_count
\ No newline at end of file
+    Windows are [t, t + width] for t = start, start + step, ... while the
+    window still ends by `end`. Records enter and leave a SegmentQueue, so
+    each step only pays for the records that changed.
+    
+    Args:
+        entries: (timestamp, (reduced_polymer, reaction_count)) in timestamp order
+        start: Start of the first window
+        end: Latest time a window may end
+        width: Window width (timedelta)
+        step: Distance between window starts (timedelta)
+        rules: Reaction rules the segments were reduced with
+        
+    Returns:
+        list: (window_start, window_end, stable_polymer, reaction_count) per window
+    """
+    entries = list(entries)
+    queue = SegmentQueue(rules)
+    entered = 0
+    left = 0
+    results = []
+    
+    window_start = start
+    while window_start + width <= end:
+        window_end = window_start + width
+        
+        while entered < len(entries) and entries[entered][0] <= window_end:
+            queue.push(entries[entered][1])
+            entered += 1
+        while left < entered and entries[left][0] < window_start:
+            queue.pop()
+            left += 1
+        
+        result, reaction_count = queue.result()
+        results.append((window_start, window_end, result, reaction_count))
+        window_start += step
+    
+    return results
+
+class SegmentQueue:
+    """
+    FIFO of reduced segments that can report their combined reaction.
+    
+    A two-stack queue: new segments are folded into the back stack as they
+    arrive, and the front stack keeps suffix combinations of older segments,
+    so both push and pop are amortized O(segment) and the window's reaction
+    is one boundary merge of the two halves.
+    
+    Each suffix combination is a linked list of (text, offset, next) chunks
+    that reuses the chunks of the newer suffix after it, so the front stack
+    takes memory proportional to its segments rather than to the number of
+    segments times the window's stable polymer.
+    """
+    
+    def __init__(self, rules: Optional[ReactionRules] = None):
+        self.rules = rules or DEFAULT_RULES
+        self.front = []  # (chunks, count) of each segment combined with everything newer in front
+        self.back = []
+        self.back_state = ReactionState(self.rules)
+    
+    def push(self, segment: tuple[str, int]) -> None:
+        self.back.append(segment)
+        self.back_state.feed_segment(*segment)
+    
+    def pop(self) -> None:
+        if not self.front:
+            combined = (None, 0)
+            for segment in reversed(self.back):
+                combined = self._prepend(segment, combined)
+                self.front.append(combined)
+            self.back = []
+            self.back_state = ReactionState(self.rules)
+        self.front.pop()
+    
+    def _prepend(self, segment: tuple[str, int], combined: tuple) -> tuple:
+        # The end of the older segment cancels against the start of the chunks
+        polymer, count = segment
+        chunks, combined_count = combined
+        partners = self.rules.partners
+        end = len(polymer)
+        while chunks is not None and end:
+            text, offset, rest = chunks
+            while offset < len(text) and end and polymer[end - 1] == partners[text[offset]]:
+                offset += 1
+                end -= 1
+            chunks = rest if offset == len(text) else (text, offset, rest)
+            if offset < len(text):
+                break
+        if end:
+            chunks = (polymer[:end] if end < len(polymer) else polymer, 0, chunks)
+        return chunks, count + combined_count + len(polymer) - end
+    
+    def result(self) -> tuple[str, int]:
+        front_count = 0
+        pieces = []
+        if self.front:
+            chunks, front_count = self.front[-1]
+            while chunks is not None:
+                text, offset, chunks = chunks
+                pieces.append(text[offset:] if offset else text)
+        polymer, boundary_count = merge_reduced(
+            ''.join(pieces), ''.join(self.back_state.stack), self.rules
+        )
+        return polymer, front_count + self.back_state.reaction_count + boundary_count
+
+def merge_reduced(left: str, right: str, rules: Optional[ReactionRules] = None) -> tuple[str, int]:
+    """
+    Join two already-reacted polymers, cancelling across the boundary.
+    
+    A reduced polymer has no reacting neighbours, so the only reactions left
+    when two of them are joined happen where they meet.
+    
+    Args:
+        left: Stable polymer that comes first in timestamp order
+        right: Stable polymer that comes after it
+        rules: Reaction rules both were reduced with
+        
+    Returns:
+        tuple: (stable_polymer, boundary_reaction_count)
+    """
+    partners = (rules or DEFAULT_RULES).partners
+    cancelled = 0
+    limit = min(len(left), len(right))
+    
+    while cancelled < limit and left[-1 - cancelled] == partners[right[cancelled]]:
+        cancelled += 1
+    
+    return left[:len(left) - cancelled] + right[cancelled:], cancelled
+
+def combine_segments(
+    segments, parallel: bool = False, rules: Optional[ReactionRules] = None
+) -> tuple[str, int]:
+    """
+    Fold pre-reacted segments into a single stable polymer.
+    
+    Gives the same result as reacting the concatenated raw polymers, but only
+    touches the already-shrunk segments.
+    
+    Args:
+        segments: Iterable of (reduced_polymer, reaction_count) in timestamp order
+        parallel: Fold one run of segments per worker in the process pool
+            and merge the partial results in order
+        rules: Reaction rules the segments were reduced with
+        
+    Returns:
+        tuple: (final_polymer, total_reaction_count)
+    """
+    rules = rules or DEFAULT_RULES
+    if parallel and settings.reactor_workers > 1:
+        segments = list(segments)
+        chunk_size = -(-len(segments) // settings.reactor_workers) or 1
+        chunks = [segments[i:i + chunk_size] for i in range(0, len(segments), chunk_size)]
+        partials = get_reaction_pool().map(combine_segments, chunks, repeat(False), repeat(rules))
+        return merge_in_order(partials, rules)
+    
+    stack = []
+    reaction_count = 0
+    partners = rules.partners
+    
+    for reduced, count in segments:
+        reaction_count += count + append_reduced(stack, reduced, partners)
+    
+    return ''.join(stack), reaction_count
+
+class ReactionState:
+    """
+    Incremental reaction over polymers fed in timestamp order.
+    
+    Only the surviving stack is held in memory, so a window can be reacted
+    while its rows are still being read.
+    """
+    
+    def __init__(self, rules: Optional[ReactionRules] = None):
+        self.rules = rules or DEFAULT_RULES
+        self.stack = []
+        self.reaction_count = 0
+    
+    def feed(self, polymer: str) -> None:
+        """
+        React raw monomers onto the stack.
+        """
+        stack = self.stack
+        partners = self.rules.partners
+        for char in polymer:
+            if stack and stack[-1] == partners[char]:
+                stack.pop()
+                self.reaction_count += 1
+            else:
+                stack.append(char)
+    
+    def feed_segment(self, reduced: str, reaction_count: int) -> None:
+        """
+        Add a pre-reacted segment; only its head can react with the stack.
+        """
+        self.reaction_count += reaction_count + append_reduced(self.stack, reduced, self.rules.partners)
+    
+    def iter_result(self, chunk_size: int = 65536):
+        """
+        Yield the stable polymer in pieces instead of one large string.
+        """
+        for i in range(0, len(self.stack), chunk_size):
+            yield ''.join(self.stack[i:i + chunk_size])
+
+class ReactionCounter(ReactionState):
+    """
+    Counting-only reaction for when the stable polymer itself isn't needed.
+    
+    Surviving monomers are kept as one byte each instead of a list of
+    characters, and only the depth and per-letter composition are reported.
+    The first non-ASCII monomer switches it to the character stack.
+    """
+    
+    def __init__(self, rules: Optional[ReactionRules] = None):
+        super().__init__(rules)
+        self.stack = bytearray()
+    
+    def feed(self, polymer: str) -> None:
+        if not self._bytes_mode(polymer):
+            return super().feed(polymer)
+        
+        stack = self.stack
+        partners = self.rules.byte_partners
+        for code in polymer.encode("ascii"):
+            if stack and stack[-1] == partners[code]:
+                stack.pop()
+                self.reaction_count += 1
+            else:
+                stack.append(code)
+    
+    def feed_segment(self, reduced: str, reaction_count: int) -> None:
+        if not self._bytes_mode(reduced):
+            return super().feed_segment(reduced, reaction_count)
+        
+        self.reaction_count += reaction_count + append_reduced(
+            self.stack, reduced.encode("ascii"), self.rules.byte_partners
+        )
+    
+    @property
+    def length(self) -> int:
+        return len(self.stack)
+    
+    def composition(self) -> dict:
+        """
+        Count each surviving monomer, keyed by letter.
+        """
+        counts = Counter(self.stack)
+        if isinstance(self.stack, bytearray):
+            return {chr(code): count for code, count in sorted(counts.items())}
+        return dict(sorted(counts.items()))
+    
+    def _bytes_mode(self, polymer: str) -> bool:
+        if isinstance(self.stack, bytearray):
+            if polymer.isascii():
+                return True
+            self.stack = list(self.stack.decode("ascii"))
+        return False
+
+def segment_columns(polymer: str) -> dict:
+    """
+    Column values for a polymer's pre-reacted segment.
+    """
+    reduced, reaction_count = react_polymer(polymer)
+    return {"reduced": reduced, "reaction_count": reaction_count}
+
+def record_segment(record, rules: Optional[ReactionRules] = None) -> tuple[str, int]:
+    """
+    Return the pre-reacted segment stored on a polymer record.
+    
+    Rows ingested before segments were persisted have no reduced form yet,
+    so those are reacted on the fly. Stored segments are reduced with the
+    polarity rules; other rules always react the raw polymer.
+    """
+    if rules is not None and not rules.canonical:
+        return react_polymer(record.polymer, rules)
+    if record.reduced is None:
+        return react_polymer(record.polymer)
+    return record.reduced, record.reaction_count
+
+@metrics.timed("react")
+def react_records(records, rules: Optional[ReactionRules] = None) -> tuple[str, int]:
+    """
+    React polymer records in timestamp order from their stored segments.
+    
+    Windows with enough reduced monomers are folded in the process pool.
+    Rules other than polarity react the raw polymers joined together.
+    
+    Args:
+        records: Polymer records in timestamp order
+        rules: Reaction rules, polarity by default
+        
+    Returns:
+        tuple: (final_polymer, total_reaction_count)
+    """
+    rules = rules or DEFAULT_RULES
+    records = list(records)
+    metrics.add_monomers(sum(len(record.polymer) for record in records))
+    if not rules.canonical:
+        # Stored segments don't apply, so react the joined raw polymers,
+        # which react_polymer hands to the NumPy engine when they are long
+        polymers = [record.polymer for record in records]
+        parallel = sum(len(polymer) for polymer in polymers) >= settings.parallel_reaction_threshold
+        return process_multiple_polymers(polymers, parallel=parallel, rules=rules)
+    segments = [record_segment(record, rules) for record in records]
+    parallel = sum(len(reduced) for reduced, _ in segments) >= settings.parallel_reaction_threshold
+    return combine_segments(segments, parallel=parallel, rules=rules)
+
+def merge_in_order(results, rules: Optional[ReactionRules] = None) -> tuple[str, int]:
+    """
+    Merge partial (stable_polymer, reaction_count) results pairwise.
+    
+    Args:
+        results: Iterable of partial results in timestamp order
+        rules: Reaction rules the partial results were reduced with
+        
+    Returns:
+        tuple: (final_polymer, total_reaction_count)
+    """
+    results = list(results)
+    if not results:
+        return "", 0
+    
+    while len(results) > 1:
+        merged = []
+        for i in range(0, len(results) - 1, 2):
+            (left, left_count), (right, right_count) = results[i], results[i + 1]
+            polymer, boundary_count = merge_reduced(left, right, rules)
+            merged.append((polymer, left_count + right_count + boundary_count))
+        if len(results) % 2:
+            merged.append(results[-1])
+        results = merged
+    
+    return results[0]
+
+_reaction_pool: Optional[ProcessPoolExecutor] = None
+_reaction_pool_lock = threading.Lock()
+
+def get_reaction_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared process pool used for parallel reactions.
+    """
+    global _reaction_pool
+    with _reaction_pool_lock:
+        if _reaction_pool is None:
+            # Spawned workers don't inherit locks held by the server's threads
+            _reaction_pool = ProcessPoolExecutor(
+                max_workers=settings.reactor_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _reaction_pool
+
+def shutdown_reaction_pool() -> None:
+    """
+    Stop the shared process pool if it was started.
+    """
+    global _reaction_pool
+    with _reaction_pool_lock:
+        if _reaction_pool is not None:
+            _reaction_pool.shutdown()
+            _reaction_pool = None
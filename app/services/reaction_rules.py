@@ -0,0 +1,141 @@
+"""
+Reaction rule sets compiled into partner tables.
+
+A rule set is written as ';'-separated clauses applied in order:
+
+    polarity        same letter, different case reacts (the default)
+    none            nothing reacts
+    inert=xX        these monomers never react
+    pairs=ab,Cd     each pair reacts; both lose any previous partner
+
+Every monomer has at most one partner, which keeps the reaction confluent:
+reduced segments still merge correctly in any grouping, so every engine
+works unchanged with any rule set. Engines only ever look up
+`partners[monomer]`, so no rule costs more per monomer than another.
+"""
+from functools import lru_cache
+from typing import List, Optional
+
+POLARITY = "polarity"
+
+class PartnerTable(dict):
+    """
+    Monomer to partner monomer, or None when it never reacts.
+
+    Monomers not named by any clause are filled in on first lookup, so
+    non-ASCII letters need no up-front table.
+    """
+
+    def __init__(self, polarity: bool):
+        super().__init__()
+        self.polarity = polarity
+
+    def __missing__(self, monomer: str) -> Optional[str]:
+        partner = _case_partner(monomer) if self.polarity else None
+        self[monomer] = partner
+        return partner
+
+    def unlink(self, monomer: str) -> None:
+        partner = self[monomer]
+        if partner is not None:
+            self[partner] = None
+        self[monomer] = None
+
+    def link(self, left: str, right: str) -> None:
+        self.unlink(left)
+        self.unlink(right)
+        self[left] = right
+        self[right] = left
+
+def _case_partner(monomer: str) -> Optional[str]:
+    partner = monomer.swapcase()
+    if len(partner) == 1 and partner != monomer and partner.swapcase() == monomer:
+        return partner
+    return None
+
+class ReactionRules:
+    """
+    A compiled rule set.
+
+    Attributes:
+        spec: Normalized rule spec, usable as a cache key
+        partners: Partner of each monomer, for the str engines
+        byte_partners: Partner byte of each ASCII byte (256 entries, None
+            for no partner), for the bytes and NumPy engines
+        canonical: Whether these are the polarity rules that stored
+            segments are reduced with
+    """
+
+    def __init__(self, spec: str = POLARITY):
+        clauses = [clause.strip() for clause in spec.split(";") if clause.strip()]
+        if not clauses or clauses[0] not in (POLARITY, "none"):
+            raise ValueError("Reaction rules must start with 'polarity' or 'none'")
+
+        partners = PartnerTable(polarity=clauses[0] == POLARITY)
+        for clause in clauses[1:]:
+            name, _, value = clause.partition("=")
+            name = name.strip()
+            value = value.strip()
+            if name == "inert" and value.isalpha():
+                for monomer in value:
+                    partners.unlink(monomer)
+            elif name == "pairs" and value:
+                for pair in value.split(","):
+                    pair = pair.strip()
+                    if len(pair) != 2 or not pair.isalpha():
+                        raise ValueError(f"Invalid reacting pair '{pair}'")
+                    partners.link(pair[0], pair[1])
+            else:
+                raise ValueError(f"Invalid reaction rule '{clause}'")
+
+        self.spec = ";".join(clauses)
+        self.partners = partners
+        self.byte_partners: List[Optional[int]] = [
+            _byte_partner(partners[chr(code)]) for code in range(128)
+        ] + [None] * 128
+        self.canonical = self.spec == POLARITY
+
+    def __repr__(self) -> str:
+        return f"ReactionRules({self.spec!r})"
+
+    def __reduce__(self):
+        # Rebuilt from the spec in process pool workers
+        return get_rules, (self.spec,)
+
+    def reacts(self, a: str, b: str) -> bool:
+        return self.partners[b] == a
+
+def _byte_partner(partner: Optional[str]) -> Optional[int]:
+    if partner is None or not partner.isascii():
+        return None
+    return ord(partner)
+
+def append_reduced(stack, reduced, partners) -> int:
+    """
+    Push a reduced segment onto a reaction stack.
+
+    A reduced segment has no reacting neighbours, so only its head can react
+    with the stack top. Works on any stack and segment the partner table is
+    keyed by: characters, ASCII bytes or 6-bit codes.
+
+    Returns:
+        int: Reactions at the boundary
+    """
+    cancelled = 0
+    while cancelled < len(reduced) and stack and stack[-1] == partners[reduced[cancelled]]:
+        stack.pop()
+        cancelled += 1
+    stack.extend(reduced[cancelled:])
+    return cancelled
+
+@lru_cache(maxsize=64)
+def get_rules(spec: str = POLARITY) -> ReactionRules:
+    """
+    Compile a rule spec once and reuse it.
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    return ReactionRules(spec)
+
+DEFAULT_RULES = get_rules(POLARITY)
@@ -0,0 +1,166 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import naive_timestamp
+from app.models.database import PolymerRecord
+from app.repositories.polymer_repository import add_ingest_listener
+
+# Ingest batches remembered for checking results computed during an ingest
+RECENT_INGESTS = 256
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    start: datetime
+    end: datetime
+
+def make_key(kind: str, start: datetime, end: datetime, **params) -> Tuple[Hashable, ...]:
+    """
+    Build a cache key from normalized query parameters.
+    """
+    return (kind, naive_timestamp(start), naive_timestamp(end), tuple(sorted(params.items())))
+
+class RangeResultCache:
+    """
+    LRU cache of time-range query results bounded by total size in bytes.
+
+    Entries are dropped as soon as a record is ingested inside their
+    [start, end] range; ingests elsewhere leave them alone.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.clear()
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is None:
+            return settings.result_cache_max_bytes
+        return self._max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Ingest counter to capture before computing a result to cache.
+        """
+        return self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+            self._recent_ingests: deque = deque(maxlen=RECENT_INGESTS)
+            self._generation = 0
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the cached value for key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(
+        self,
+        key: Hashable,
+        start: datetime,
+        end: datetime,
+        value: Any,
+        size: int,
+        generation: int
+    ) -> None:
+        """
+        Cache a value computed from the database as of `generation`.
+
+        The value is dropped if a record landed in its range after the
+        generation was captured, since it may predate that record.
+        """
+        start, end = naive_timestamp(start), naive_timestamp(end)
+        with self._lock:
+            if size > self.max_bytes or self._ingested_since(generation, start, end):
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+
+            self._entries[key] = CacheEntry(value, size, start, end)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, timestamps: List[datetime]) -> None:
+        """
+        Drop every entry whose range contains one of the timestamps.
+        """
+        timestamps = sorted(naive_timestamp(timestamp) for timestamp in timestamps)
+        if not timestamps:
+            return
+
+        with self._lock:
+            self._generation += 1
+            self._recent_ingests.append((self._generation, timestamps))
+
+            for key, entry in list(self._entries.items()):
+                if _contains_any(timestamps, entry.start, entry.end):
+                    del self._entries[key]
+                    self.size -= entry.size
+                    self.invalidations += 1
+
+    def on_ingest(self, records: List[PolymerRecord]) -> None:
+        self.invalidate([record.timestamp for record in records])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _ingested_since(self, generation: int, start: datetime, end: datetime) -> bool:
+        if generation == self._generation:
+            return False
+        if not self._recent_ingests or self._recent_ingests[0][0] > generation + 1:
+            # Too many ingests since to tell; assume the range was touched
+            return True
+        return any(
+            _contains_any(timestamps, start, end)
+            for ingest_generation, timestamps in self._recent_ingests
+            if ingest_generation > generation
+        )
+
+def _contains_any(sorted_timestamps: List[datetime], start: datetime, end: datetime) -> bool:
+    position = bisect_left(sorted_timestamps, start)
+    return position < len(sorted_timestamps) and sorted_timestamps[position] <= end
+
+# Process-wide cache shared by all requests
+result_cache = RangeResultCache()
+add_ingest_listener(result_cache.on_ingest)
@@ -0,0 +1,72 @@
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+# A pass that removes less than this fraction of the polymer means the rest is
+# deeply nested, so the remaining work is cheaper on a stack
+MIN_PASS_SHRINK = 1 / 32
+
+# Byte that each ASCII letter reacts with, or None for non-letters
+ASCII_PARTNERS = [
+    code ^ 0x20 if chr(code).isascii() and chr(code).isalpha() else None
+    for code in range(256)
+]
+
+def vectorized_available() -> bool:
+    return np is not None
+
+def react_polymer_vectorized(polymer: str, partners: list = ASCII_PARTNERS) -> tuple[str, int]:
+    """
+    Array-based equivalent of react_polymer for ASCII polymers.
+
+    Each pass cancels every non-overlapping reacting pair at once; once the
+    passes stop shrinking the polymer much, the remainder finishes on a byte
+    stack. The reaction is confluent, so the result matches the stack order.
+
+    Args:
+        polymer: ASCII polymer string
+        partners: Partner byte of each byte, or None where it never reacts
+
+    Returns:
+        tuple: (stable_polymer, reaction_count)
+    """
+    codes = np.frombuffer(polymer.encode("ascii"), dtype=np.uint8)
+    original_length = len(codes)
+    # 256 matches no byte, so monomers without a partner never react
+    partner_table = np.array([256 if partner is None else partner for partner in partners], dtype=np.uint16)
+
+    while len(codes) > 1:
+        reacts = partner_table[codes[:-1]] == codes[1:]
+
+        if not reacts.any():
+            break
+
+        # In a run like "aAaA" the pairs overlap; keep every other one
+        positions = np.arange(len(reacts))
+        previous = np.concatenate(([False], reacts[:-1]))
+        run_start = np.maximum.accumulate(np.where(reacts & ~previous, positions, 0))
+        selected = reacts & ((positions - run_start) % 2 == 0)
+
+        keep = np.ones(len(codes), dtype=bool)
+        keep[:-1] &= ~selected
+        keep[1:] &= ~selected
+        removed = len(codes) - int(keep.sum())
+        codes = codes[keep]
+
+        if removed < len(codes) * MIN_PASS_SHRINK:
+            break
+
+    stack = _react_bytes(codes.tobytes(), partners)
+    return stack.decode("ascii"), (original_length - len(stack)) // 2
+
+def _react_bytes(data: bytes, partners: list) -> bytearray:
+    stack = bytearray()
+
+    for code in data:
+        if stack and stack[-1] == partners[code]:
+            stack.pop()
+        else:
+            stack.append(code)
+
+    return stack
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+def encode_cursor(timestamp: datetime, record_id: int) -> str:
+    """
+    Encode the position after a record as an opaque page cursor.
+    
+    Args:
+        timestamp: Timestamp of the last record on the page
+        record_id: Id of the last record on the page
+        
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = json.dumps([timestamp.isoformat(), record_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Cursor from a previous page
+        
+    Returns:
+        tuple: (timestamp, record_id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(record_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
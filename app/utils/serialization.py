@@ -0,0 +1,32 @@
+import json
+from typing import Iterable, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+def encode_polymer_list(rows: Iterable, next_cursor: Optional[str] = None) -> bytes:
+    """
+    Encode (timestamp, polymer) rows as a PolymerList JSON body.
+    
+    Skips building and re-validating a Pydantic model per record; the output
+    matches what PolymerList would serialize to.
+    
+    Args:
+        rows: Rows with timestamp and polymer attributes
+        next_cursor: Cursor for the following page, if any
+        
+    Returns:
+        bytes: JSON document
+    """
+    polymers = [{"timestamp": row.timestamp, "polymer": row.polymer} for row in rows]
+    
+    if orjson is not None:
+        return orjson.dumps({"polymers": polymers, "next_cursor": next_cursor})
+    
+    for polymer in polymers:
+        polymer["timestamp"] = polymer["timestamp"].isoformat()
+    return json.dumps(
+        {"polymers": polymers, "next_cursor": next_cursor}, separators=(",", ":")
+    ).encode()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Measure the cold-tier archive: database and archive size before and after
+archiving all but the last month of a year of records, and range reads
+that hit only hot rows, only archived blocks, or both.
+
+Run from the repository root:
+    python -m benchmarks.bench_archive
+"""
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine
+from app.core.migrations import upgrade_schema
+from app.repositories.archive import read_block
+from app.repositories.polymer_repository import PolymerRepository
+from benchmarks.generator import START, PolymerProfile, generate_records
+
+ROWS = 300_000
+PROFILE = PolymerProfile(interval_ms=365 * 24 * 3600 * 1000 // ROWS)
+BATCH = 10_000
+
+def best_of(func, *args, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def database_mb(engine, path: str) -> float:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        connection.execute(text("VACUUM"))
+    return os.path.getsize(path) / 2 ** 20
+
+def directory_mb(directory: str) -> float:
+    return sum(entry.stat().st_size for entry in os.scandir(directory)) / 2 ** 20
+
+if __name__ == "__main__":
+    records = generate_records(ROWS, profile=PROFILE)
+    end = records[-1].timestamp
+    cutoff = end - timedelta(days=30)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        settings.archive_dir = os.path.join(directory, "archive")
+        engine = build_engine(f"sqlite:///{path}")
+        upgrade_schema(engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with Session() as session:
+            for i in range(0, ROWS, BATCH):
+                PolymerRepository(session).create_many(records[i:i + BATCH])
+
+        ranges = {
+            "recent day (hot)": (end - timedelta(days=1), end),
+            "old day (archived)": (START + timedelta(days=100), START + timedelta(days=101)),
+            "week across cutoff": (cutoff - timedelta(days=3), cutoff + timedelta(days=4)),
+        }
+
+        def read(start, stop):
+            with Session() as session:
+                return PolymerRepository(session).get_by_time_range(start, stop)
+
+        def timings():
+            results = {}
+            for name, (start, stop) in ranges.items():
+                read_block.cache_clear()
+                started = time.perf_counter()
+                rows = read(start, stop)
+                cold_ms = (time.perf_counter() - started) * 1000
+                results[name] = (len(rows), cold_ms, best_of(read, start, stop))
+            return results
+
+        before_mb = database_mb(engine, path)
+        before = timings()
+
+        started = time.perf_counter()
+        with Session() as session:
+            archived = PolymerRepository(session).archive_before(cutoff)
+        archive_s = time.perf_counter() - started
+
+        after_mb = database_mb(engine, path)
+        after = timings()
+
+        print(f"archived {archived} of {ROWS} records in {archive_s:.1f} s")
+        print(f"database {before_mb:.1f} MB -> {after_mb:.1f} MB, archive {directory_mb(settings.archive_dir):.1f} MB")
+        for name in ranges:
+            rows, _, hot_ms = before[name]
+            _, cold_ms, warm_ms = after[name]
+            print(
+                f"{name:<20} | {rows:>5} rows | all in SQLite {hot_ms:>6.2f} ms | "
+                f"archive enabled {warm_ms:>6.2f} ms (first read {cold_ms:>6.2f} ms)"
+            )
+        engine.dispose()
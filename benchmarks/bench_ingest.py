@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Compare ingest throughput of the per-record loop against the bulk path.
+
+Run from the repository root:
+    python -m benchmarks.bench_ingest
+"""
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.repositories.polymer_repository import PolymerRepository
+from benchmarks.generator import generate_records
+
+BATCH_SIZES = [1_000, 10_000]
+
+def time_ingest(batch: list, bulk: bool) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        repository = PolymerRepository(session)
+        
+        started = time.perf_counter()
+        if bulk:
+            repository.create_many(batch)
+        else:
+            for polymer in batch:
+                repository.create(polymer)
+        elapsed = time.perf_counter() - started
+        
+        session.close()
+        engine.dispose()
+        return elapsed
+
+if __name__ == "__main__":
+    for size in BATCH_SIZES:
+        batch = generate_records(size)
+        loop = time_ingest(batch, bulk=False)
+        bulk = time_ingest(batch, bulk=True)
+        print(
+            f"{size:>7} rows | loop {size / loop:>10.0f} rows/s | "
+            f"bulk {size / bulk:>10.0f} rows/s | {loop / bulk:.1f}x"
+        )
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Compare the raw reaction loop on str against the 6-bit byte-code engine.
+
+Run from the repository root:
+    python -m benchmarks.bench_packed
+"""
+import time
+
+from app.core.config import settings
+from app.services.polymer_codec import encode_codes, react_codes
+from app.services.polymer_service import react_polymer
+from benchmarks.generator import generate_records
+
+ROWS = 20_000
+
+def best_of(func, *args, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+if __name__ == "__main__":
+    polymer = ''.join(item.polymer for item in generate_records(ROWS))
+    codes = encode_codes(polymer)
+    assert react_codes(codes)[1] == react_polymer(polymer)[1]
+    settings.vectorized_reaction_threshold = len(polymer) + 1
+    str_ms = best_of(react_polymer, polymer)
+    bytes_ms = best_of(react_codes, codes)
+    print(f"reaction of {len(polymer)} monomers | str stack {str_ms:>7.1f} ms | byte codes {bytes_ms:>7.1f} ms")
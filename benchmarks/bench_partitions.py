@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare one polymer_records table with monthly partitions: ingest into a
+database that already holds a year of records, a one-hour /reactor-style
+range read and a filtered page, and the cost of dropping the oldest month.
+
+Run from the repository root:
+    python -m benchmarks.bench_partitions
+"""
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import build_engine
+from app.core.migrations import drop_partitions_before, upgrade_schema
+from app.models import partitions
+from app.models.database import PolymerRecord
+from app.repositories.polymer_repository import PolymerRepository
+from benchmarks.generator import START, PolymerProfile, generate_records
+
+ROWS = 500_000
+# Spread the rows over a year, so each month holds about a twelfth
+PROFILE = PolymerProfile(interval_ms=365 * 24 * 3600 * 1000 // ROWS)
+BATCH = 10_000
+
+def best_of(func, *args, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+def run(directory: str, partitioned: bool, records: list, extra: list) -> None:
+    settings.partitioned_storage = partitioned
+    engine = build_engine(f"sqlite:///{os.path.join(directory, f'{partitioned}.db')}")
+    upgrade_schema(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as session:
+        for i in range(0, len(records), BATCH):
+            PolymerRepository(session).create_many(records[i:i + BATCH])
+
+    def ingest():
+        with Session() as session:
+            PolymerRepository(session).create_many(extra)
+    ingest_ms = best_of(ingest, repeats=1)
+
+    start = START + timedelta(days=200)
+    end = start + timedelta(hours=1)
+
+    def range_read():
+        with Session() as session:
+            PolymerRepository(session).get_by_time_range(start, end)
+
+    def filtered_page():
+        with Session() as session:
+            PolymerRepository(session).get_rows_by_time_range_with_filters(
+                start, start + timedelta(days=30), length_gt=100, limit=100
+            )
+
+    range_ms = best_of(range_read)
+    page_ms = best_of(filtered_page)
+
+    oldest_month_end = partitions.partition_bounds(partitions.partition_name(START))[1]
+    started = time.perf_counter()
+    if partitioned:
+        drop_partitions_before(engine, oldest_month_end)
+    else:
+        with engine.begin() as connection:
+            connection.execute(delete(PolymerRecord).where(PolymerRecord.timestamp < oldest_month_end))
+    retention_ms = (time.perf_counter() - started) * 1000
+
+    name = "partitioned" if partitioned else "single table"
+    print(
+        f"{name:>12} | ingest {len(extra)} {ingest_ms:>7.1f} ms | 1h range {range_ms:>6.2f} ms | "
+        f"filtered page {page_ms:>6.2f} ms | drop oldest month {retention_ms:>7.1f} ms"
+    )
+    engine.dispose()
+
+if __name__ == "__main__":
+    records = generate_records(ROWS + BATCH, profile=PROFILE)
+    with tempfile.TemporaryDirectory() as directory:
+        for partitioned in (False, True):
+            run(directory, partitioned, records[:ROWS], records[ROWS:])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Compare GET /polymers response building: ORM entities validated through
+PolymerList and response_model against the column-only fast path.
+
+Run from the repository root:
+    python -m benchmarks.bench_serialization
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, build_engine
+from app.models.schemas import PolymerList
+from app.repositories.polymer_repository import PolymerRepository
+from app.utils.serialization import encode_polymer_list
+from benchmarks.generator import generate_records
+
+SIZES = [10_000, 100_000]
+
+def orm_path(repository, start, end) -> bytes:
+    records = repository.get_by_time_range_with_filters(start, end)
+    polymer_list = PolymerList(polymers=[p for p in records])
+    # What FastAPI does with response_model before encoding
+    validated = PolymerList.model_validate(polymer_list.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+def fast_path(repository, start, end) -> bytes:
+    return encode_polymer_list(repository.get_rows_by_time_range_with_filters(start, end))
+
+def best_of(func, *args, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        
+        session = Session()
+        batch = generate_records(max(SIZES))
+        for i in range(0, len(batch), 10_000):
+            PolymerRepository(session).create_many(batch[i:i + 10_000])
+        session.close()
+        
+        start = datetime(2023, 7, 10)
+        for size in SIZES:
+            end = start + timedelta(milliseconds=size - 1)
+            session = Session()
+            repository = PolymerRepository(session)
+            assert json.loads(orm_path(repository, start, end))["polymers"] == \
+                json.loads(fast_path(repository, start, end))["polymers"]
+            session.expunge_all()
+            orm_ms = best_of(lambda: (orm_path(repository, start, end), session.expunge_all()))
+            fast_ms = best_of(fast_path, repository, start, end)
+            session.close()
+            print(f"{size:>7} rows | ORM + Pydantic {orm_ms:>8.1f} ms | fast path {fast_ms:>8.1f} ms | {orm_ms / fast_ms:.1f}x")
+        
+        engine.dispose()
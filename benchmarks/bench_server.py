@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Load-test the development server (run.py) against the production launcher
+(serve.py) on the same seeded database.
+
+Each server is started as a subprocess, driven by several client processes
+with a mix of /reactor, GET /polymers and /health_check requests, then
+stopped with SIGINT so graceful shutdown is exercised as well.
+
+Run from the repository root:
+    python -m benchmarks.bench_server
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.generator import START, generate_records
+
+ROWS = 50_000
+DURATION = 10.0
+CLIENT_PROCESSES = max(2, os.cpu_count() or 1)
+CONCURRENCY = 32  # per client process
+HEADERS = {"Authorization": f"Bearer {settings.api_keys[0]}"}
+
+SERVERS = {
+    "run.py (reload, 1 worker)": ([sys.executable, "run.py"], 8000),
+    "serve.py": ([sys.executable, "serve.py", "--port", "8001"], 8001),
+}
+
+def wait_until_ready(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health_check", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not become ready")
+
+def seed(base_url: str) -> None:
+    records = generate_records(ROWS)
+    with httpx.Client(base_url=base_url, headers=HEADERS, timeout=60.0) as client:
+        for i in range(0, ROWS, 5000):
+            payload = [
+                {"timestamp": record.timestamp.isoformat(), "polymer": record.polymer}
+                for record in records[i:i + 5000]
+            ]
+            response = client.post("/polymers", json=payload)
+            if response.status_code not in (201, 409):
+                raise RuntimeError(f"Seeding failed: {response.status_code} {response.text[:200]}")
+
+def request_path(rng: random.Random) -> str:
+    kind = rng.random()
+    start = START + timedelta(milliseconds=rng.randrange(ROWS - 1000))
+    if kind < 0.45:
+        end = start + timedelta(milliseconds=rng.choice([10, 100, 1000]))
+        return f"/reactor?start={start.isoformat()}&end={end.isoformat()}"
+    if kind < 0.9:
+        end = start + timedelta(milliseconds=1000)
+        return f"/polymers?start={start.isoformat()}&end={end.isoformat()}&limit=100"
+    return "/health_check"
+
+async def drive(base_url: str, seed_value: int, stop_at: float) -> tuple:
+    latencies = []
+    errors = 0
+    rng = random.Random(seed_value)
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=HEADERS, limits=limits, timeout=30.0) as client:
+        async def user():
+            nonlocal errors
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(request_path(rng))
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(user() for _ in range(CONCURRENCY)))
+    return latencies, errors
+
+def client_process(args) -> tuple:
+    base_url, seed_value, stop_at = args
+    return asyncio.run(drive(base_url, seed_value, stop_at))
+
+def load_test(base_url: str) -> dict:
+    # Wall-clock deadline shared by all client processes
+    stop_at = time.monotonic() + DURATION
+    with multiprocessing.get_context("spawn").Pool(CLIENT_PROCESSES) as pool:
+        parts = pool.map(client_process, [(base_url, i, stop_at) for i in range(CLIENT_PROCESSES)])
+    latencies = sorted(latency for part, _ in parts for latency in part)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in parts),
+        "rps": len(latencies) / DURATION,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+def stop(process: subprocess.Popen) -> float:
+    started = time.perf_counter()
+    process.send_signal(signal.SIGINT)
+    process.wait(timeout=60)
+    return time.perf_counter() - started
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        seeded = False
+        for name, (command, port) in SERVERS.items():
+            base_url = f"http://127.0.0.1:{port}"
+            process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_ready(base_url)
+                if not seeded:
+                    seed(base_url)
+                    seeded = True
+                result = load_test(base_url)
+            finally:
+                shutdown_s = stop(process)
+            print(
+                f"{name:<28} | {result['rps']:>8.0f} req/s | p50 {result['p50_ms']:>7.1f} ms | "
+                f"p99 {result['p99_ms']:>7.1f} ms | errors {result['errors']} | shutdown {shutdown_s:.1f} s"
+            )
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compare ingest and range-query throughput with the SQLite profile on and off.
+
+Run from the repository root:
+    python -m benchmarks.bench_sqlite_profile
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, build_engine
+from app.repositories.polymer_repository import PolymerRepository
+from benchmarks.generator import generate_records
+
+BATCHES = 300
+BATCH_SIZE = 20
+READERS = 4
+DURATION = 3.0
+
+def run(tuned: bool) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", tuned=tuned)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        records = generate_records(BATCHES * BATCH_SIZE)
+        
+        # Commit-bound ingest: many small transactions
+        session = Session()
+        started = time.perf_counter()
+        for i in range(0, len(records) // 2, BATCH_SIZE):
+            PolymerRepository(session).create_many(records[i:i + BATCH_SIZE])
+        ingest_rate = (len(records) // 2) / (time.perf_counter() - started)
+        session.close()
+        
+        # Range queries from several threads while the writer keeps ingesting
+        stop = time.perf_counter() + DURATION
+        queries = [0] * READERS
+        
+        def read(slot):
+            session = Session()
+            start = datetime(2023, 7, 10)
+            while time.perf_counter() < stop:
+                PolymerRepository(session).get_by_time_range(start, start + timedelta(milliseconds=100))
+                queries[slot] += 1
+            session.close()
+        
+        def write():
+            session = Session()
+            for i in range(len(records) // 2, len(records), BATCH_SIZE):
+                if time.perf_counter() >= stop:
+                    break
+                PolymerRepository(session).create_many(records[i:i + BATCH_SIZE])
+            session.close()
+        
+        threads = [threading.Thread(target=read, args=(slot,)) for slot in range(READERS)]
+        threads.append(threading.Thread(target=write))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        engine.dispose()
+        return {"ingest": ingest_rate, "queries": sum(queries) / DURATION}
+
+if __name__ == "__main__":
+    for tuned in (False, True):
+        result = run(tuned)
+        print(
+            f"profile {'on ' if tuned else 'off'} | ingest {result['ingest']:>8.0f} rows/s | "
+            f"range queries {result['queries']:>8.0f} q/s (with concurrent writer)"
+        )
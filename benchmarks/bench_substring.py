@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Compare substring filter latency with the trigram index against a plain scan.
+
+Run from the repository root:
+    python -m benchmarks.bench_substring
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base, build_engine
+from app.repositories.polymer_repository import PolymerRepository
+from benchmarks.generator import generate_records
+
+ROWS = 100_000
+SUBSTRINGS = ["aBcDe", "EEEdd", "ab"]
+REPEATS = 5
+
+def time_queries(session, substring: str, case_sensitive: bool) -> float:
+    repository = PolymerRepository(session)
+    start = datetime(2023, 7, 1)
+    end = start + timedelta(days=60)
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        matches = repository.get_by_time_range_with_filters(
+            start, end, substring=substring, case_sensitive=case_sensitive
+        )
+    return (time.perf_counter() - started) / REPEATS * 1000, len(matches)
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        
+        batch = generate_records(ROWS)
+        for i in range(0, ROWS, 10_000):
+            PolymerRepository(session).create_many(batch[i:i + 10_000])
+        
+        for substring in SUBSTRINGS:
+            for case_sensitive in (True, False):
+                settings.substring_index_enabled = False
+                scan_ms, scan_rows = time_queries(session, substring, case_sensitive)
+                settings.substring_index_enabled = True
+                index_ms, index_rows = time_queries(session, substring, case_sensitive)
+                assert scan_rows == index_rows
+                print(
+                    f"{substring!r:>8} case_sensitive={case_sensitive!s:<5} | {scan_rows:>6} rows | "
+                    f"scan {scan_ms:>8.1f} ms | trigram {index_ms:>8.1f} ms"
+                )
+        
+        session.close()
+        engine.dispose()
@@ -0,0 +1,94 @@
+"""
+Deterministic synthetic polymers and timestamps for benchmarks.
+
+The same seed and parameters always give the same data, so timings from
+different commits are measured on identical input.
+"""
+import math
+import random
+import string
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from app.models.schemas import PolymerCreate
+
+START = datetime(2023, 7, 10)
+
+@dataclass(frozen=True)
+class PolymerProfile:
+    """
+    Shape of the generated data.
+
+    Attributes:
+        letters: Distinct letters in use; each appears in both cases
+        reactivity: Chance that a monomer is the reacting partner of the one
+            before it, so 0 never reacts and values near 1 mostly cancel
+        length: "uniform", "normal" or "exponential" polymer lengths
+        min_length: Shortest polymer
+        max_length: Longest polymer (the API accepts at most 128)
+        interval_ms: Gap between consecutive timestamps, so record i is
+            at START + i * interval_ms
+        jitter: Draw gaps from an exponential distribution with that mean
+            instead, like bursty production traffic
+    """
+    letters: int = 5
+    reactivity: float = 0.3
+    length: str = "uniform"
+    min_length: int = 1
+    max_length: int = 128
+    interval_ms: int = 1
+    jitter: bool = False
+
+    def alphabet(self) -> str:
+        lower = string.ascii_lowercase[:self.letters]
+        return lower + lower.upper()
+
+def polymer_length(rng: random.Random, profile: PolymerProfile) -> int:
+    low, high = profile.min_length, profile.max_length
+    if profile.length == "uniform":
+        length = rng.randint(low, high)
+    elif profile.length == "normal":
+        length = round(rng.gauss((low + high) / 2, (high - low) / 6))
+    elif profile.length == "exponential":
+        length = low + math.floor(rng.expovariate(4 / (high - low + 1)))
+    else:
+        raise ValueError(f"Unknown length distribution '{profile.length}'")
+    return min(max(length, low), high)
+
+def make_polymer(rng: random.Random, length: int, profile: PolymerProfile) -> str:
+    alphabet = profile.alphabet()
+    monomers = [rng.choice(alphabet)]
+    for _ in range(length - 1):
+        if rng.random() < profile.reactivity:
+            monomers.append(monomers[-1].swapcase())
+        else:
+            monomers.append(rng.choice(alphabet))
+    return ''.join(monomers)
+
+def generate_polymer(monomers: int, seed: int = 0, profile: PolymerProfile = PolymerProfile()) -> str:
+    """
+    One long polymer, for reaction benchmarks beyond the API's length limit.
+    """
+    return make_polymer(random.Random(seed), monomers, profile)
+
+def iter_records(
+    count: int, seed: int = 0, profile: PolymerProfile = PolymerProfile()
+) -> Iterator[PolymerCreate]:
+    """
+    Yield `count` polymers with strictly increasing timestamps.
+    """
+    rng = random.Random(seed)
+    timestamp = START
+    for _ in range(count):
+        yield PolymerCreate(timestamp=timestamp, polymer=make_polymer(rng, polymer_length(rng, profile), profile))
+        gap = profile.interval_ms
+        if profile.jitter:
+            # Never zero, so timestamps stay unique
+            gap = max(1, round(rng.expovariate(1 / profile.interval_ms)))
+        timestamp += timedelta(milliseconds=gap)
+
+def generate_records(
+    count: int, seed: int = 0, profile: PolymerProfile = PolymerProfile()
+) -> List[PolymerCreate]:
+    return list(iter_records(count, seed, profile))
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Timing and peak memory of the hot paths at growing data sizes.
+
+Every benchmark runs at each power of ten from 10^3 up to --max-scale (or
+its own cap), on data from benchmarks.generator with a fixed seed. Results
+are written as JSON; pass an earlier file to --compare to flag regressions.
+
+Run from the repository root:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --max-scale 10000000 --output before.json
+    python -m benchmarks.suite --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base, build_engine
+from app.models.database import PolymerRecord, TRIGRAM_TABLE, trigram_index_enabled
+from app.models.schemas import PolymerList
+from app.repositories.polymer_repository import PolymerRepository
+from app.services.polymer_service import (
+    combine_segments, process_multiple_polymers, react_polymer
+)
+from app.services.vectorized_reactor import vectorized_available
+from app.utils.serialization import encode_polymer_list
+from benchmarks.generator import START, PolymerProfile, generate_polymer, generate_records
+
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "latest.json")
+# Timings below this are mostly noise and are never flagged
+NOISE_FLOOR_S = 0.001
+NOISE_FLOOR_BYTES = 64 * 1024
+
+@dataclass
+class Case:
+    run: Callable[[], object]
+    # Called before every run, outside the measurement
+    reset: Optional[Callable[[], object]] = None
+
+@dataclass
+class Benchmark:
+    name: str
+    unit: str
+    max_scale: int
+    setup: Callable
+
+@dataclass
+class Result:
+    name: str
+    unit: str
+    scale: int
+    repeats: int
+    best_s: float
+    median_s: float
+    peak_bytes: int
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def benchmark(name: str, unit: str, max_scale: int = 10 ** 7):
+    """
+    Register a setup function: a context manager taking (scale, env) and
+    yielding the Case to measure.
+    """
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, unit, max_scale, contextmanager(setup))
+        return setup
+    return register
+
+class Environment:
+    """
+    Scratch directory, seed and data shared by the benchmarks of one run.
+    """
+
+    def __init__(self, directory: str, seed: int):
+        self.directory = directory
+        self.seed = seed
+        self.profile = PolymerProfile()
+        self._records = {}
+        self._databases = {}
+
+    def records(self, scale: int) -> list:
+        if scale not in self._records:
+            self._records = {scale: generate_records(scale, self.seed, self.profile)}
+        return self._records[scale]
+
+    def database(self, scale: int):
+        """
+        Session factory for a database holding `scale` generated rows.
+        """
+        if scale not in self._databases:
+            engine = build_engine(f"sqlite:///{os.path.join(self.directory, f'rows_{scale}.db')}")
+            Base.metadata.create_all(bind=engine)
+            Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            ingest(Session, self.records(scale))
+            self._databases[scale] = (engine, Session)
+        return self._databases[scale][1]
+
+    def close(self) -> None:
+        for engine, _ in self._databases.values():
+            engine.dispose()
+
+def ingest(Session, records: list, chunk_size: int = 10_000) -> None:
+    with Session() as session:
+        repository = PolymerRepository(session)
+        for i in range(0, len(records), chunk_size):
+            repository.create_many(records[i:i + chunk_size])
+
+def window(scale: int):
+    return START, START + timedelta(milliseconds=scale * PolymerProfile().interval_ms)
+
+# ===== BENCHMARKS =====
+
+@benchmark("react_polymer", unit="monomers")
+def react_polymer_case(scale: int, env: Environment):
+    polymer = generate_polymer(scale, env.seed, env.profile)
+    yield Case(lambda: react_polymer(polymer))
+
+@benchmark("react_polymer_stack", unit="monomers")
+def react_polymer_stack_case(scale: int, env: Environment):
+    polymer = generate_polymer(scale, env.seed, env.profile)
+    threshold = settings.vectorized_reaction_threshold
+    settings.vectorized_reaction_threshold = scale + 1
+    try:
+        yield Case(lambda: react_polymer(polymer))
+    finally:
+        settings.vectorized_reaction_threshold = threshold
+
+@benchmark("process_multiple_polymers", unit="rows", max_scale=10 ** 6)
+def process_multiple_polymers_case(scale: int, env: Environment):
+    polymers = [record.polymer for record in env.records(scale)]
+    yield Case(lambda: process_multiple_polymers(polymers))
+
+@benchmark("combine_segments", unit="rows", max_scale=10 ** 6)
+def combine_segments_case(scale: int, env: Environment):
+    segments = [react_polymer(record.polymer) for record in env.records(scale)]
+    yield Case(lambda: combine_segments(segments))
+
+@benchmark("ingest_create_many", unit="rows", max_scale=10 ** 6)
+def ingest_case(scale: int, env: Environment):
+    records = env.records(scale)
+    engine = build_engine(f"sqlite:///{os.path.join(env.directory, 'ingest.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def empty():
+        with engine.begin() as connection:
+            connection.execute(delete(PolymerRecord))
+            if trigram_index_enabled():
+                connection.execute(text(f"INSERT INTO {TRIGRAM_TABLE} ({TRIGRAM_TABLE}) VALUES ('delete-all')"))
+
+    try:
+        yield Case(lambda: ingest(Session, records), reset=empty)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+@benchmark("query_time_range", unit="rows", max_scale=10 ** 6)
+def query_time_range_case(scale: int, env: Environment):
+    Session = env.database(scale)
+    start, end = window(scale)
+
+    def run():
+        with Session() as session:
+            return PolymerRepository(session).get_rows_by_time_range_with_filters(start, end)
+
+    yield Case(run)
+
+@benchmark("query_filters", unit="rows", max_scale=10 ** 6)
+def query_filters_case(scale: int, env: Environment):
+    Session = env.database(scale)
+    start, end = window(scale)
+
+    def run():
+        with Session() as session:
+            return PolymerRepository(session).get_rows_by_time_range_with_filters(
+                start, end, length_gt=32, substring="abc", case_sensitive=False
+            )
+
+    yield Case(run)
+
+@benchmark("serialize_fast_path", unit="rows", max_scale=10 ** 6)
+def serialize_fast_path_case(scale: int, env: Environment):
+    with env.database(scale)() as session:
+        rows = PolymerRepository(session).get_rows_by_time_range_with_filters(*window(scale))
+    yield Case(lambda: encode_polymer_list(rows))
+
+@benchmark("serialize_pydantic", unit="rows", max_scale=10 ** 6)
+def serialize_pydantic_case(scale: int, env: Environment):
+    with env.database(scale)() as session:
+        rows = PolymerRepository(session).get_rows_by_time_range_with_filters(*window(scale))
+    polymers = [{"timestamp": row.timestamp, "polymer": row.polymer} for row in rows]
+    yield Case(lambda: PolymerList(polymers=polymers).model_dump_json())
+
+# ===== RUNNER =====
+
+def measure(benchmark: Benchmark, scale: int, env: Environment, repeats: int) -> Result:
+    with benchmark.setup(scale, env) as case:
+        timings = []
+        for _ in range(repeats):
+            if case.reset:
+                case.reset()
+            started = time.perf_counter()
+            case.run()
+            timings.append(time.perf_counter() - started)
+
+        # Separate run: tracing slows everything down
+        if case.reset:
+            case.reset()
+        tracemalloc.start()
+        try:
+            case.run()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return Result(
+        name=benchmark.name,
+        unit=benchmark.unit,
+        scale=scale,
+        repeats=repeats,
+        best_s=min(timings),
+        median_s=statistics.median(timings),
+        peak_bytes=peak_bytes
+    )
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": vectorized_available(),
+    }
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    """
+    Describe every result more than `threshold` slower or larger than its
+    baseline at the same scale.
+    """
+    previous = {(result["name"], result["scale"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["scale"]))
+        if before is None:
+            continue
+        if result["best_s"] > NOISE_FLOOR_S and result["best_s"] > before["best_s"] * (1 + threshold):
+            regressions.append(
+                f"{result['name']} @ {result['scale']}: time {before['best_s'] * 1000:.1f} ms "
+                f"-> {result['best_s'] * 1000:.1f} ms"
+            )
+        if result["peak_bytes"] > NOISE_FLOOR_BYTES and result["peak_bytes"] > before["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                f"{result['name']} @ {result['scale']}: peak memory {before['peak_bytes'] / 2 ** 20:.1f} MiB "
+                f"-> {result['peak_bytes'] / 2 ** 20:.1f} MiB"
+            )
+    return regressions
+
+def scales_up_to(max_scale: int) -> List[int]:
+    scales = []
+    scale = 1000
+    while scale <= max_scale:
+        scales.append(scale)
+        scale *= 10
+    return scales
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--max-scale", type=int, default=100_000, help="largest scale to run (default 10^5)")
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per benchmark and scale")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated data")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging, 0.25 = 25%%")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.list:
+        for benchmark in BENCHMARKS.values():
+            print(f"{benchmark.name:<28} {benchmark.unit:<9} up to {benchmark.max_scale:,}")
+        return 0
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        env = Environment(directory, args.seed)
+        try:
+            for scale in scales_up_to(args.max_scale):
+                for name in names:
+                    benchmark = BENCHMARKS[name]
+                    if scale > benchmark.max_scale:
+                        continue
+                    result = measure(benchmark, scale, env, args.repeats)
+                    results.append(asdict(result))
+                    print(
+                        f"{result.name:<28} {result.scale:>10,} {result.unit:<9} | "
+                        f"best {result.best_s * 1000:>10.2f} ms | median {result.median_s * 1000:>10.2f} ms | "
+                        f"peak {result.peak_bytes / 2 ** 20:>8.2f} MiB"
+                    )
+        finally:
+            env.close()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as output:
+        json.dump({"meta": metadata(), "results": results}, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline)["results"], args.threshold)
+        if regressions:
+            print(f"Regressions against {args.compare}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions against {args.compare}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Simple script to run the Polymer Tracker API
+Simple script to run the Polymer Tracker API in development, with
+auto-reload. Use serve.py for production.
 """
 import uvicorn
 import os
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the Polymer Tracker API.
+
+Runs several uvicorn worker processes on one socket, with uvloop and
+httptools when they are installed and no file watcher. The schema is
+created and upgraded once here, before any worker starts, so workers don't
+race each other on it. On SIGINT/SIGTERM each worker stops accepting
+connections and lets in-flight requests finish for up to
+--graceful-timeout seconds.
+
+The reactor index and the result cache live in each process and only see
+the ingests that process serves, so with either enabled a single worker is
+started whatever --workers says.
+
+    python serve.py --workers 4 --port 8000
+
+For development with auto-reload, use run.py instead.
+"""
+import argparse
+import importlib.util
+import os
+from typing import List
+
+import uvicorn
+
+from app.core.config import settings
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def per_process_features() -> List[str]:
+    """
+    Enabled features whose state would go stale with several workers.
+    """
+    features = []
+    if settings.reactor_index_enabled:
+        features.append("REACTOR_INDEX_ENABLED")
+    if settings.result_cache_max_bytes > 0:
+        features.append("RESULT_CACHE_MAX_BYTES")
+    return features
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Polymer Tracker API in production")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.web_workers, help="worker processes (default: CPU count)")
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=settings.graceful_shutdown_timeout,
+        help="seconds to let in-flight requests finish on shutdown"
+    )
+    parser.add_argument("--access-log", action="store_true", help="log every request")
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    workers = max(1, args.workers)
+    features = per_process_features()
+    if workers > 1 and features:
+        print(f"⚠️  {' and '.join(features)} keep state in one process, starting 1 worker instead of {workers}")
+        workers = 1
+    
+    from app.core.database import engine
+    from app.core.migrations import upgrade_schema
+    upgrade_schema(engine)
+    engine.dispose()
+    
+    # Workers are fresh processes that read settings from the environment
+    os.environ["INIT_SCHEMA_ON_STARTUP"] = "false"
+    if "REACTOR_WORKERS" not in os.environ:
+        # Share the CPUs between the web workers' reaction pools
+        os.environ["REACTOR_WORKERS"] = str(max(1, (os.cpu_count() or 1) // workers))
+    
+    loop = "uvloop" if available("uvloop") else "asyncio"
+    http = "httptools" if available("httptools") else "h11"
+    print(f"🚀 Starting {settings.app_name} with {workers} workers ({loop}, {http})...")
+    
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        access_log=args.access_log,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ from sqlalchemy.orm import sessionmaker
 
 from app.main import app
 from app.core.database import Base, get_db
+from app.repositories.reactor_index import reactor_index
+from app.services.result_cache import result_cache
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_polymers.db"
@@ -25,6 +27,14 @@ def db_session():
     # Drop the test database
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def reset_process_state():
+    reactor_index.reset()
+    result_cache.clear()
+    yield
+    reactor_index.reset()
+    result_cache.clear()
+
 @pytest.fixture(scope="function")
 def client(db_session):
     def override_get_db():
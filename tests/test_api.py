@@ -152,4 +152,231 @@ class TestAPIEndpoints:
         data = response.json()
         # Our algorithm produces "efxxB" with 2 reactions for this input
         assert data["result"] == "efxxB"
-        assert data["reaction_count"] == 2
\ No newline at end of file
+        assert data["reaction_count"] == 2
+
+    def test_reactor_reacts_across_record_boundaries(self, client: TestClient, auth_headers: dict):
+        """Test reactor cancels monomers that meet at record boundaries"""
+        test_data = [
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"},
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "cBAy"}
+        ]
+        
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        response = client.get(
+            "/reactor?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["result"] == "xy"
+        assert data["reaction_count"] == 3
+
+    def test_reactor_stream_matches_reactor(self, client: TestClient, auth_headers: dict):
+        """Test streamed reactor result matches the regular endpoint"""
+        test_data = [
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"},
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "cBAy"},
+            {"timestamp": "2023-07-10T08:00:45.000", "polymer": "AaefxxxXB"}
+        ]
+        
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        query = "start=2023-07-10T08:00:00&end=2023-07-10T08:01:00"
+        expected = client.get(f"/reactor?{query}", headers=auth_headers).json()
+        response = client.get(f"/reactor/stream?{query}", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json() == expected
+        assert response.json()["result"] == "xyefxxB"
+
+    def test_reactor_with_custom_rules(self, client: TestClient, auth_headers: dict):
+        """Test reactor endpoints apply a per-request rule set"""
+        test_data = [
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"},
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "cBAy"}
+        ]
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        query = "start=2023-07-10T08:00:00&end=2023-07-10T08:01:00"
+        response = client.get(f"/reactor?{query}&rules=polarity;inert=cC", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["result"] == "xabCcBAy"
+        assert response.json()["reaction_count"] == 0
+        
+        response = client.get(f"/reactor/stats?{query}&rules=polarity;pairs=xy,Cc", headers=auth_headers)
+        assert (response.json()["length"], response.json()["reaction_count"]) == (0, 4)
+        
+        response = client.get(f"/reactor?{query}", headers=auth_headers)
+        assert response.json()["result"] == "xy"
+        
+        response = client.get(f"/reactor?{query}&rules=flip", headers=auth_headers)
+        assert response.status_code == 400
+    
+    def test_slow_query_diagnostics(self, client: TestClient, auth_headers: dict, monkeypatch):
+        """Test slow statements are exposed on the diagnostics endpoint"""
+        from app.core.database import slow_query_log
+        from tests.conftest import engine
+        
+        monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+        slow_query_log.clear()
+        slow_query_log.attach(engine)
+        try:
+            client.get(
+                "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00&length_gt=3",
+                headers=auth_headers
+            )
+        finally:
+            slow_query_log.detach(engine)
+        
+        assert client.get("/diagnostics/slow-queries").status_code == 403
+        response = client.get("/diagnostics/slow-queries", headers=auth_headers)
+        assert response.status_code == 200
+        queries = response.json()["queries"]
+        assert any("polymer_records" in query["statement"] and query["plan"] for query in queries)
+        slow_query_log.clear()
+    
+    def test_ingest_polymers_batch_is_all_or_nothing(self, client: TestClient, auth_headers: dict):
+        """Test a batch with a conflicting timestamp stores nothing"""
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "abc"}
+        ], headers=auth_headers)
+        
+        response = client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "def"},
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "ghi"}
+        ], headers=auth_headers)
+        assert response.status_code == 409
+        
+        # Duplicates inside one batch are rejected too
+        response = client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:10.000", "polymer": "def"},
+            {"timestamp": "2023-07-10T08:00:10.000", "polymer": "ghi"}
+        ], headers=auth_headers)
+        assert response.status_code == 409
+        
+        response = client.get(
+            "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00",
+            headers=auth_headers
+        )
+        assert [p["polymer"] for p in response.json()["polymers"]] == ["abc"]
+
+    def test_ingest_polymers_ndjson(self, client: TestClient, auth_headers: dict, monkeypatch):
+        """Test streamed NDJSON ingestion flushes in chunks"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "ingest_chunk_size", 2)
+        
+        body = "\n".join(
+            f'{{"timestamp": "2023-07-10T08:00:0{i}.000", "polymer": "abc"}}'
+            for i in range(5)
+        ) + "\n"
+        headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+        
+        response = client.post("/polymers/ndjson", content=body, headers=headers)
+        assert response.status_code == 201
+        data = response.json()
+        assert data["ingested"] == 5
+        assert [chunk["ingested"] for chunk in data["chunks"]] == [2, 2, 1]
+        
+        response = client.get(
+            "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00",
+            headers=auth_headers
+        )
+        assert len(response.json()["polymers"]) == 5
+
+    def test_ingest_polymers_ndjson_invalid_line(self, client: TestClient, auth_headers: dict):
+        """Test NDJSON ingestion reports the failing line"""
+        body = (
+            '{"timestamp": "2023-07-10T08:00:00.000", "polymer": "abc"}\n'
+            '{"timestamp": "2023-07-10T08:00:01.000", "polymer": "ab1"}\n'
+        )
+        headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+        
+        response = client.post("/polymers/ndjson", content=body, headers=headers)
+        assert response.status_code == 422
+        assert response.json()["detail"].startswith("Line 2")
+        
+        response = client.post("/polymers/ndjson", content=body, headers=auth_headers)
+        assert response.status_code == 415
+
+
+    def test_reactor_stats(self, client: TestClient, auth_headers: dict):
+        """Test reactor stats summarize the reactor result"""
+        test_data = [
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"},
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "cBAyAaefxxxXB"}
+        ]
+        
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        response = client.get(
+            "/reactor/stats?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["reaction_count"] == 5
+        assert data["length"] == len("xyefxxB")
+        assert data["composition"] == {"B": 1, "e": 1, "f": 1, "x": 3, "y": 1}
+        assert "result" not in data
+
+    def test_reactor_batch_matches_individual_calls(self, client: TestClient, auth_headers: dict):
+        """Test batch reactor answers every window like /reactor"""
+        test_data = [
+            {"timestamp": f"2023-07-10T08:0{i}:00.000", "polymer": polymer}
+            for i, polymer in enumerate(["xabC", "cBAy", "AaefxxxXB", "bXxB", "Yq"])
+        ]
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        windows = [
+            {"start": "2023-07-10T08:00:00", "end": "2023-07-10T08:01:00"},
+            {"start": "2023-07-10T08:01:00", "end": "2023-07-10T08:04:00"},
+            {"start": "2023-07-10T08:00:00", "end": "2023-07-10T08:09:00"},
+            {"start": "2023-07-10T09:00:00", "end": "2023-07-10T10:00:00"}
+        ]
+        response = client.post("/reactor/batch", json={"windows": windows}, headers=auth_headers)
+        assert response.status_code == 200
+        results = response.json()["results"]
+        
+        for window, result in zip(windows, results):
+            expected = client.get(
+                f"/reactor?start={window['start']}&end={window['end']}", headers=auth_headers
+            ).json()
+            assert result == expected
+        
+        response = client.post("/reactor/batch", json={"windows": [
+            {"start": "2023-07-10T09:00:00", "end": "2023-07-10T08:00:00"}
+        ]}, headers=auth_headers)
+        assert response.status_code == 422
+
+
+    def test_reactor_sliding_windows(self, client: TestClient, auth_headers: dict):
+        """Test sliding windows match /reactor for each window"""
+        test_data = [
+            {"timestamp": f"2023-07-10T08:0{i}:00.000", "polymer": polymer}
+            for i, polymer in enumerate(["xabC", "cBAy", "AaefxxxXB", "bXxB", "Yq"])
+        ]
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        response = client.get(
+            "/reactor/sliding?start=2023-07-10T08:00:00&end=2023-07-10T08:05:00&width=PT2M&step=PT1M",
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 4
+        
+        for result in results:
+            expected = client.get(
+                f"/reactor?start={result['start_timestamp']}&end={result['end_timestamp']}",
+                headers=auth_headers
+            ).json()
+            assert result == expected
+        
+        response = client.get(
+            "/reactor/sliding?start=2023-07-10T08:00:00&end=2023-07-10T08:05:00&width=PT2M&step=PT0S",
+            headers=auth_headers
+        )
+        assert response.status_code == 400
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import build_engine
+from app.models.schemas import PolymerCreate
+from app.repositories.archive import RecordArchive, merge_sorted
+
+BASE_TIME = datetime(2023, 7, 10, 8, 0, 0)
+
+class TestRecordArchive:
+    def test_blocks_round_trip_and_prune(self, tmp_path):
+        archive = RecordArchive(str(tmp_path))
+        records = [
+            SimpleNamespace(
+                id=i, timestamp=BASE_TIME + timedelta(minutes=i), polymer="aBcé"[:1 + i % 4],
+                reduced=None if i % 3 else "ab",
+                reaction_count=None if i == 2 else i, created_at=None if i == 3 else BASE_TIME
+            )
+            for i in range(10)
+        ]
+        with archive.writer() as writer:
+            writer.write_block(records[:4])
+            writer.write_block(records[4:])
+
+        assert [(block.first, block.last) for block in archive.blocks()] == [
+            (BASE_TIME, BASE_TIME + timedelta(minutes=3)),
+            (BASE_TIME + timedelta(minutes=4), BASE_TIME + timedelta(minutes=9)),
+        ]
+        read = list(archive.records())
+        assert [record.polymer for record in read] == [record.polymer for record in records]
+        assert [record.reduced for record in read[:4]] == ["ab", None, None, "ab"]
+        assert [(read[2].reaction_count, read[3].created_at)] == [(None, None)]
+
+        window = archive.records(BASE_TIME + timedelta(minutes=5), BASE_TIME + timedelta(minutes=6, seconds=30))
+        assert [record.id for record in window] == [5, 6]
+        assert archive.existing_timestamps([BASE_TIME + timedelta(minutes=7), BASE_TIME]) == [
+            BASE_TIME + timedelta(minutes=7), BASE_TIME
+        ]
+        assert archive.existing_timestamps([BASE_TIME + timedelta(seconds=30)]) == []
+
+    def test_merge_keeps_first_copy_of_a_timestamp(self):
+        hot = [SimpleNamespace(timestamp=BASE_TIME + timedelta(minutes=i), tier="hot") for i in (1, 2)]
+        cold = [SimpleNamespace(timestamp=BASE_TIME + timedelta(minutes=i), tier="cold") for i in (0, 2)]
+
+        assert [record.tier for record in merge_sorted(hot, cold)] == ["cold", "hot", "hot"]
+
+class TestRepositoryArchive:
+    @pytest.mark.parametrize("partitioned", [False, True])
+    def test_reads_are_unchanged_by_archiving(self, tmp_path, monkeypatch, partitioned):
+        from app.core.migrations import upgrade_schema
+        from app.repositories.polymer_repository import PolymerRepository
+
+        monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+        monkeypatch.setattr(settings, "partitioned_storage", partitioned)
+        engine = build_engine(f"sqlite:///{tmp_path / 'hot.db'}")
+        try:
+            upgrade_schema(engine)
+            polymers = ["AaefxxxXB", "abc", "cBAy", "xEFa", "dD"]
+            with Session(bind=engine) as session:
+                PolymerRepository(session).create_many([
+                    PolymerCreate(timestamp=BASE_TIME + timedelta(days=15 * i), polymer=polymers[i % 5])
+                    for i in range(10)
+                ])
+
+            start, end = BASE_TIME, BASE_TIME + timedelta(days=365)
+
+            def snapshot():
+                with Session(bind=engine) as session:
+                    repository = PolymerRepository(session)
+                    records = repository.get_by_time_range(start, end)
+                    page = repository.get_rows_by_time_range_with_filters(
+                        start, end, length_gt=2, substring="EF", case_sensitive=False, limit=3
+                    )
+                    next_page = repository.get_by_time_range_with_filters(
+                        start, end, length_gt=2, substring="EF", case_sensitive=False, limit=3,
+                        after=(page[-1].timestamp, page[-1].id)
+                    )
+                    exact_case = repository.get_rows_by_time_range_with_filters(start, end, substring="EF")
+                    return (
+                        [(r.id, r.timestamp, r.polymer, r.reduced, r.reaction_count, r.length) for r in records],
+                        [(r.id, r.polymer) for r in page],
+                        [(r.id, r.polymer) for r in next_page],
+                        [r.polymer for r in exact_case],
+                        list(repository.iter_segments_by_time_range(start, end)),
+                        len(repository.get_all_polymers()),
+                    )
+
+            before = snapshot()
+            with Session(bind=engine) as session:
+                archived = PolymerRepository(session).archive_before(BASE_TIME + timedelta(days=100), block_rows=2)
+                hot = sum(
+                    session.scalar(select(func.count()).select_from(entity))
+                    for entity, _ in PolymerRepository(session)._tables()
+                )
+
+            assert (archived, hot) == (7, 3)
+            assert snapshot() == before
+            assert [polymer for _, polymer in before[1] + before[2]] == ["AaefxxxXB", "xEFa", "AaefxxxXB", "xEFa"]
+            assert before[3] == ["xEFa", "xEFa"]
+
+            with Session(bind=engine) as session:
+                with pytest.raises(ValueError, match="already exists"):
+                    PolymerRepository(session).create(PolymerCreate(timestamp=BASE_TIME, polymer="ab"))
+        finally:
+            engine.dispose()
+
+    def test_short_busy_timeout_commits_every_block(self, tmp_path, monkeypatch):
+        from app.core.migrations import upgrade_schema
+        from app.repositories.polymer_repository import PolymerRepository
+
+        monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+        engine = build_engine(f"sqlite:///{tmp_path / 'hot.db'}")
+        try:
+            upgrade_schema(engine)
+            with Session(bind=engine) as session:
+                PolymerRepository(session).create_many([
+                    PolymerCreate(timestamp=BASE_TIME + timedelta(minutes=i), polymer="ab") for i in range(7)
+                ])
+
+            # No time to spare under the lock: every block is its own file
+            monkeypatch.setattr(settings, "sqlite_busy_timeout_ms", 0)
+            with Session(bind=engine) as session:
+                archived = PolymerRepository(session).archive_before(BASE_TIME + timedelta(hours=1), block_rows=2)
+
+            files = RecordArchive(settings.archive_dir).blocks()
+            assert archived == 7
+            assert len({block.path for block in files}) == len(files) == 4
+        finally:
+            engine.dispose()
@@ -0,0 +1,40 @@
+from benchmarks.generator import PolymerProfile, generate_polymer, generate_records
+from benchmarks.suite import compare
+from app.services.polymer_service import react_polymer
+
+class TestGenerator:
+    def test_deterministic_for_a_seed(self):
+        assert generate_records(50, seed=4) == generate_records(50, seed=4)
+        assert generate_records(50, seed=4) != generate_records(50, seed=5)
+
+    def test_profile_shapes_the_data(self):
+        for length in ("uniform", "normal", "exponential"):
+            profile = PolymerProfile(length=length, min_length=10, max_length=20, letters=3)
+            records = generate_records(200, profile=profile)
+            assert all(10 <= len(record.polymer) <= 20 for record in records)
+            assert set(''.join(record.polymer for record in records)) <= set("abcABC")
+
+        timestamps = [record.timestamp for record in generate_records(100, profile=PolymerProfile(jitter=True))]
+        assert timestamps == sorted(set(timestamps))
+
+    def test_reactivity_controls_reactions(self):
+        _, calm = react_polymer(generate_polymer(10_000, profile=PolymerProfile(reactivity=0.0)))
+        _, reactive = react_polymer(generate_polymer(10_000, profile=PolymerProfile(reactivity=0.9)))
+        assert reactive > 2 * calm
+
+class TestCompare:
+    def test_flags_slower_and_larger_results(self):
+        baseline = [
+            {"name": "react_polymer", "scale": 1000, "best_s": 0.010, "peak_bytes": 1_000_000},
+            {"name": "query_filters", "scale": 1000, "best_s": 0.010, "peak_bytes": 1_000_000},
+        ]
+        results = [
+            {"name": "react_polymer", "scale": 1000, "best_s": 0.011, "peak_bytes": 1_000_000},
+            {"name": "query_filters", "scale": 1000, "best_s": 0.020, "peak_bytes": 3_000_000},
+            {"name": "query_filters", "scale": 10000, "best_s": 1.0, "peak_bytes": 1},
+        ]
+
+        regressions = compare(results, baseline, threshold=0.25)
+
+        assert len(regressions) == 2
+        assert all(regression.startswith("query_filters @ 1000") for regression in regressions)
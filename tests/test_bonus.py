@@ -96,4 +96,64 @@ class TestBonusFeatures:
             "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T09:00:00&length_gt=10&length_lt=5",
             headers=auth_headers
         )
-        assert response.status_code == 400  # Should fail validation
\ No newline at end of file
+        assert response.status_code == 400  # Should fail validation
+
+    def test_polymers_search_substring_index(self, client: TestClient, auth_headers: dict, monkeypatch):
+        """Test substring results are the same with and without the trigram index"""
+        from app.core.config import settings
+        
+        test_data = [
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "helloWorld"},
+            {"timestamp": "2023-07-10T08:01:00.000", "polymer": "worldPeace"},
+            {"timestamp": "2023-07-10T08:02:00.000", "polymer": "abcdef"}
+        ]
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        def search(substring, case_sensitive):
+            response = client.get(
+                "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T09:00:00"
+                f"&substring={substring}&case_sensitive={case_sensitive}",
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+            return [p["polymer"] for p in response.json()["polymers"]]
+        
+        queries = [
+            ("ldP", "true"), ("LDP", "false"), ("or", "true"), ("e", "false"), ("xyz", "true"),
+            ("world", "true"), ("ABC", "true"), ("ABC", "false"), ("d_f", "false")
+        ]
+        indexed = [search(*query) for query in queries]
+        monkeypatch.setattr(settings, "substring_index_enabled", False)
+        assert [search(*query) for query in queries] == indexed
+        assert indexed[0] == ["worldPeace"]
+        assert indexed[3] == ["helloWorld", "worldPeace", "abcdef"]
+        assert indexed[4] == []
+        # Inputs that differ only in case match only without case_sensitive
+        assert indexed[5:8] == [["worldPeace"], [], ["abcdef"]]
+        # Wildcard characters are matched literally
+        assert indexed[8] == []
+
+    def test_polymers_keyset_pagination(self, client: TestClient, auth_headers: dict):
+        """Test paging through polymers with limit and cursor"""
+        test_data = [
+            {"timestamp": f"2023-07-10T08:0{i}:00.000", "polymer": "abc" + "d" * i}
+            for i in range(5)
+        ]
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        
+        url = "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T09:00:00&limit=2"
+        pages = []
+        cursor = None
+        while True:
+            response = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=auth_headers)
+            assert response.status_code == 200
+            data = response.json()
+            pages.append([p["polymer"] for p in data["polymers"]])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert pages == [["abc", "abcd"], ["abcdd", "abcddd"], ["abcdddd"]]
+        
+        response = client.get(url + "&cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 400
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.core.database import Base, get_db
+from app.main import app
+from app.models.schemas import PolymerCreate
+from app.repositories.polymer_repository import AsyncPolymerRepository
+from tests.conftest import TestingSessionLocal
+
+class TestConcurrency:
+    @pytest.mark.parametrize("mode", ["thread", "async"])
+    @pytest.mark.parametrize("path", ["/reactor", "/reactor/stats"])
+    def test_health_checks_stay_fast_during_reaction(self, db_session, auth_headers, monkeypatch, tmp_path, mode, path):
+        """Test a slow reaction does not block the event loop"""
+        def slow_react(records, rules=None):
+            time.sleep(0.5)
+            return "", 0
+        
+        def slow_feed(state, rows):
+            time.sleep(0.5)
+        
+        def session_per_request():
+            db = TestingSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+        
+        monkeypatch.setattr(routes, "react_records", slow_react)
+        monkeypatch.setattr(routes, "feed_rows", slow_feed)
+        
+        async def scenario():
+            if mode == "async":
+                pytest.importorskip("aiosqlite")
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+                
+                from app.api.dependencies import get_polymer_repository
+                from app.core.database import build_async_engine
+                
+                engine = build_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+                async with engine.begin() as connection:
+                    await connection.run_sync(Base.metadata.create_all)
+                Session = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+                
+                async def async_repository():
+                    async with Session() as session:
+                        yield AsyncPolymerRepository(session)
+                
+                app.dependency_overrides[get_polymer_repository] = async_repository
+            else:
+                engine = None
+                app.dependency_overrides[get_db] = session_per_request
+            
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    await client.post("/polymers", json=[
+                        {"timestamp": "2023-07-10T08:00:00.000", "polymer": "abc"}
+                    ], headers=auth_headers)
+                    
+                    started = time.perf_counter()
+                    reaction = asyncio.create_task(client.get(
+                        f"{path}?start=2023-07-10T08:00:00&end=2023-07-10T09:00:00",
+                        headers=auth_headers
+                    ))
+                    await asyncio.sleep(0.05)
+                    
+                    for _ in range(5):
+                        response = await client.get("/health_check")
+                        assert response.status_code == 200
+                        response = await client.get(
+                            "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T09:00:00",
+                            headers=auth_headers
+                        )
+                        assert len(response.json()["polymers"]) == 1
+                    answered = time.perf_counter() - started
+                    
+                    assert not reaction.done()
+                    assert (await reaction).status_code == 200
+                    return answered
+            finally:
+                app.dependency_overrides.clear()
+                if engine is not None:
+                    await engine.dispose()
+        
+        assert asyncio.run(scenario()) < 0.5
+
+class TestAsyncRepository:
+    def test_async_session_round_trip(self, tmp_path):
+        """Test the repository runs on an aiosqlite session"""
+        pytest.importorskip("aiosqlite")
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        
+        async def scenario():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                repository = AsyncPolymerRepository(session)
+                await repository.create_many([
+                    PolymerCreate(timestamp=datetime(2023, 7, 10, 8), polymer="xabC"),
+                    PolymerCreate(timestamp=datetime(2023, 7, 10, 9), polymer="cBAy")
+                ])
+                await repository.ping()
+                records = await repository.get_by_time_range(
+                    datetime(2023, 7, 10), datetime(2023, 7, 11)
+                )
+            
+            await engine.dispose()
+            return [record.polymer for record in records]
+        
+        assert asyncio.run(scenario()) == ["xabC", "cBAy"]
+    
+    def test_async_engine_serves_a_request(self, tmp_path, auth_headers):
+        """Test the configured async engine builds and answers a request"""
+        pytest.importorskip("aiosqlite")
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        
+        from app.api.dependencies import get_polymer_repository
+        from app.core.database import build_async_engine
+        
+        async def scenario():
+            engine = build_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            Session = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+            
+            async def async_repository():
+                async with Session() as session:
+                    yield AsyncPolymerRepository(session)
+            
+            app.dependency_overrides[get_polymer_repository] = async_repository
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    created = await client.post("/polymers", json=[
+                        {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"}
+                    ], headers=auth_headers)
+                    response = await client.get(
+                        "/reactor?start=2023-07-10T08:00:00&end=2023-07-10T09:00:00",
+                        headers=auth_headers
+                    )
+            finally:
+                app.dependency_overrides.clear()
+                await engine.dispose()
+            return created.status_code, response.status_code, response.json()["result"]
+        
+        assert asyncio.run(scenario()) == (201, 200, "xabC")
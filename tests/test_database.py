@@ -0,0 +1,340 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from app.core.config import settings
+from app.core.database import build_engine
+
+class TestSQLiteProfile:
+    def _pragma(self, engine, name):
+        with engine.connect() as connection:
+            return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_profile_applied_to_connections(self, tmp_path):
+        engine = build_engine(f"sqlite:///{tmp_path / 'tuned.db'}", tuned=True)
+        try:
+            assert self._pragma(engine, "journal_mode") == "wal"
+            assert self._pragma(engine, "synchronous") == 1  # NORMAL
+            assert self._pragma(engine, "cache_size") == settings.sqlite_cache_size
+            assert self._pragma(engine, "temp_store") == 2  # MEMORY
+            assert self._pragma(engine, "busy_timeout") == settings.sqlite_busy_timeout_ms
+            assert engine.pool.size() == settings.db_pool_size
+        finally:
+            engine.dispose()
+
+    def test_profile_can_be_disabled(self, tmp_path):
+        engine = build_engine(f"sqlite:///{tmp_path / 'plain.db'}", tuned=False)
+        try:
+            assert self._pragma(engine, "journal_mode") == "delete"
+        finally:
+            engine.dispose()
+
+    def test_memory_database_skips_pool_sizing(self):
+        engine = build_engine("sqlite://", tuned=True)
+        try:
+            assert self._pragma(engine, "busy_timeout") == settings.sqlite_busy_timeout_ms
+        finally:
+            engine.dispose()
+
+class TestSchemaUpgrade:
+    def test_upgrade_backfills_legacy_rows(self, tmp_path):
+        from sqlalchemy.orm import Session
+        
+        from app.core.migrations import upgrade_schema
+        from app.models.database import PolymerRecord
+        
+        engine = build_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "CREATE TABLE polymer_records ("
+                    "id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL UNIQUE, "
+                    "polymer VARCHAR(128) NOT NULL, created_at DATETIME)"
+                ))
+                connection.execute(text(
+                    "INSERT INTO polymer_records (timestamp, polymer) VALUES "
+                    "('2023-07-10 08:00:00.000000', 'AaefxxxXB'), "
+                    "('2023-07-10 08:01:00.000000', 'abc')"
+                ))
+            
+            upgrade_schema(engine, batch_size=1)
+            
+            with Session(bind=engine) as session:
+                records = session.query(PolymerRecord).order_by(PolymerRecord.timestamp).all()
+                assert [(r.length, r.reduced, r.reaction_count) for r in records] == [
+                    (9, "efxxB", 2), (3, "abc", 0)
+                ]
+            
+            from datetime import datetime
+            from sqlalchemy import event
+            
+            from app.repositories.polymer_repository import PolymerRepository
+            
+            # Explain the statement the repository runs for a filtered page
+            statements = []
+            def capture(connection, cursor, statement, parameters, context, executemany):
+                statements.append((statement, parameters))
+            event.listen(engine, "before_cursor_execute", capture)
+            with Session(bind=engine) as session:
+                PolymerRepository(session).get_rows_by_time_range_with_filters(
+                    datetime(2023, 1, 1), datetime(2024, 1, 1), length_gt=5, limit=10
+                )
+            event.remove(engine, "before_cursor_execute", capture)
+            statement, parameters = next(item for item in statements if "length >" in item[0])
+            with engine.connect() as connection:
+                plan = str(connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all())
+            assert "ix_polymer_records_timestamp_length" in plan
+            assert "TEMP B-TREE" not in plan
+            
+            with Session(bind=engine) as session:
+                matches = PolymerRepository(session).get_by_time_range_with_filters(
+                    datetime(2023, 1, 1), datetime(2024, 1, 1), substring="EFX", case_sensitive=False
+                )
+                assert [r.polymer for r in matches] == ["AaefxxxXB"]
+        finally:
+            engine.dispose()
+
+    def test_startup_upgrades_a_baseline_database(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from sqlalchemy.orm import sessionmaker
+        
+        from app import main
+        from app.core.database import get_db
+        
+        engine = build_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+        try:
+            # polymer_records as it was before segments and lengths were stored
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "CREATE TABLE polymer_records ("
+                    "id INTEGER NOT NULL PRIMARY KEY, timestamp DATETIME NOT NULL, "
+                    "polymer VARCHAR(128) NOT NULL, created_at DATETIME)"
+                ))
+                connection.execute(text("CREATE UNIQUE INDEX ix_polymer_records_timestamp ON polymer_records (timestamp)"))
+                connection.execute(text(
+                    "INSERT INTO polymer_records (timestamp, polymer) VALUES "
+                    "('2023-07-10 08:00:00.000000', 'xabC'), ('2023-07-10 08:00:30.000000', 'cBAy')"
+                ))
+            
+            Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            def session_per_request():
+                with Session() as session:
+                    yield session
+            
+            monkeypatch.setattr(main, "engine", engine)
+            main.app.dependency_overrides[get_db] = session_per_request
+            try:
+                with TestClient(main.app) as client:
+                    response = client.get(
+                        "/reactor?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00",
+                        headers={"Authorization": "Bearer test-key-123"}
+                    )
+            finally:
+                main.app.dependency_overrides.clear()
+            
+            assert response.status_code == 200
+            assert (response.json()["result"], response.json()["reaction_count"]) == ("xy", 3)
+        finally:
+            engine.dispose()
+
+    def test_upgrade_unpacks_packed_segments(self, tmp_path):
+        from sqlalchemy.orm import Session
+        
+        from app.core.migrations import upgrade_schema
+        from app.models.database import PolymerRecord
+        from app.services.polymer_codec import pack
+        
+        engine = build_engine(f"sqlite:///{tmp_path / 'packed.db'}")
+        try:
+            # A database from a release that could store segments 6-bit packed
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "CREATE TABLE polymer_records ("
+                    "id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL UNIQUE, "
+                    "polymer VARCHAR(128) NOT NULL, reduced VARCHAR(128), reduced_packed BLOB, "
+                    "reaction_count INTEGER, length INTEGER, created_at DATETIME)"
+                ))
+                connection.execute(text(
+                    "INSERT INTO polymer_records (timestamp, polymer, reduced, reduced_packed, reaction_count, length) "
+                    "VALUES ('2023-07-10 08:00:00.000000', 'AaefxxxXB', NULL, :efxxb, 2, 9), "
+                    "('2023-07-10 08:01:00.000000', 'abc', NULL, :abc, 0, 3), "
+                    "('2023-07-10 08:02:00.000000', 'éa', 'éa', NULL, 0, 2)"
+                ), {"efxxb": pack("efxxB"), "abc": pack("abc")})
+            upgrade_schema(engine, batch_size=1)
+            
+            assert "reduced_packed" not in {column["name"] for column in inspect(engine).get_columns("polymer_records")}
+            with Session(bind=engine) as session:
+                records = session.query(PolymerRecord).order_by(PolymerRecord.timestamp).all()
+                assert [(r.reduced, r.reaction_count) for r in records] == [("efxxB", 2), ("abc", 0), ("éa", 0)]
+        finally:
+            engine.dispose()
+
+class TestSlowQueryLog:
+    def _engine(self, tmp_path):
+        from app.core.database import Base
+        
+        engine = build_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO polymer_records (timestamp, polymer, length) VALUES "
+                "('2023-07-10 08:00:00.000000', 'AaefxxxXB', 9)"
+            ))
+        return engine
+
+    def test_records_slow_statements_with_plan(self, tmp_path):
+        from datetime import datetime
+        from sqlalchemy.orm import Session
+        
+        from app.core.database import SlowQueryLog
+        from app.repositories.polymer_repository import PolymerRepository
+        
+        engine = self._engine(tmp_path)
+        log = SlowQueryLog(threshold_ms=0, size=2, log_full_scans=False)
+        log.attach(engine)
+        try:
+            with Session(bind=engine) as session:
+                PolymerRepository(session).get_by_time_range_with_filters(
+                    datetime(2023, 1, 1), datetime(2024, 1, 1), length_gt=5
+                )
+            
+            latest = log.entries()[0]
+            assert "FROM polymer_records" in latest["statement"]
+            assert "2023-01-01 00:00:00.000000" in latest["parameters"]
+            assert any("USING INDEX" in step for step in latest["plan"])
+            assert not latest["full_scan"]
+            
+            with engine.connect() as connection:
+                for _ in range(3):
+                    connection.execute(text("SELECT id FROM polymer_records WHERE polymer = 'x'")).all()
+            assert len(log.entries()) == 2
+            assert all(entry["full_scan"] for entry in log.entries())
+        finally:
+            log.detach(engine)
+            engine.dispose()
+
+    def test_full_scans_logged_regardless_of_time(self, tmp_path):
+        from app.core.database import SlowQueryLog
+        
+        engine = self._engine(tmp_path)
+        log = SlowQueryLog(threshold_ms=60_000, log_full_scans=True)
+        log.attach(engine)
+        try:
+            with engine.connect() as connection:
+                connection.execute(text(
+                    "SELECT id FROM polymer_records WHERE timestamp >= '2023-01-01'"
+                )).all()
+                assert log.entries() == []
+                connection.execute(text("SELECT id FROM polymer_records WHERE polymer LIKE '%ef%'")).all()
+            
+            assert [entry["statement"] for entry in log.entries()] == [
+                "SELECT id FROM polymer_records WHERE polymer LIKE '%ef%'"
+            ]
+        finally:
+            log.detach(engine)
+            engine.dispose()
+
+    def test_failed_statements_leave_no_state(self, tmp_path):
+        from sqlalchemy.exc import OperationalError
+        
+        from app.core.database import SlowQueryLog
+        
+        engine = self._engine(tmp_path)
+        log = SlowQueryLog(threshold_ms=0)
+        log.attach(engine)
+        try:
+            with engine.connect() as connection:
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT missing FROM polymer_records"))
+                connection.execute(text("SELECT id FROM polymer_records")).all()
+                assert not any(key.startswith("query") for key in connection.info)
+            
+            assert [entry["statement"] for entry in log.entries()] == ["SELECT id FROM polymer_records"]
+        finally:
+            log.detach(engine)
+            engine.dispose()
+
+class TestPartitions:
+    def test_repository_routes_and_prunes_by_month(self, tmp_path, monkeypatch):
+        from datetime import datetime
+        from sqlalchemy.orm import Session
+        
+        from app.core.migrations import upgrade_schema
+        from app.models import partitions
+        from app.models.schemas import PolymerCreate
+        from app.repositories.polymer_repository import PolymerRepository
+        
+        monkeypatch.setattr(settings, "partitioned_storage", True)
+        engine = build_engine(f"sqlite:///{tmp_path / 'partitioned.db'}")
+        try:
+            upgrade_schema(engine)
+            with Session(bind=engine) as session:
+                repository = PolymerRepository(session)
+                created = repository.create_many([
+                    PolymerCreate(timestamp=datetime(2023, 8, 1), polymer="efxAugust"),
+                    PolymerCreate(timestamp=datetime(2023, 6, 30, 23, 59), polymer="efxJune"),
+                    PolymerCreate(timestamp=datetime(2023, 7, 15), polymer="July"),
+                ])
+                repository.create(PolymerCreate(timestamp=datetime(2023, 7, 1), polymer="efxJuly"))
+                with pytest.raises(ValueError, match="already exists"):
+                    repository.create(PolymerCreate(timestamp=datetime(2023, 7, 1), polymer="abc"))
+                
+                assert [record.polymer for record in created] == ["efxAugust", "efxJune", "July"]
+                assert partitions.list_partitions(session) == [
+                    "polymer_records_202306", "polymer_records_202307", "polymer_records_202308"
+                ]
+                assert len({record.id for record in repository.get_all_polymers()}) == 4
+                
+                july = repository.get_by_time_range(datetime(2023, 7, 1), datetime(2023, 7, 31))
+                assert [record.polymer for record in july] == ["efxJuly", "July"]
+                
+                first_page = repository.get_rows_by_time_range_with_filters(
+                    datetime(2023, 1, 1), datetime(2024, 1, 1), substring="EFX", case_sensitive=False, limit=2
+                )
+                assert [row.polymer for row in first_page] == ["efxJune", "efxJuly"]
+                next_page = repository.get_rows_by_time_range_with_filters(
+                    datetime(2023, 1, 1), datetime(2024, 1, 1), substring="efx", limit=2,
+                    after=(first_page[-1].timestamp, first_page[-1].id)
+                )
+                assert [row.polymer for row in next_page] == ["efxAugust"]
+        finally:
+            engine.dispose()
+    
+    def test_upgrade_moves_rows_and_drops_old_months(self, tmp_path, monkeypatch):
+        from datetime import datetime
+        from sqlalchemy.orm import Session
+        
+        from app.core.migrations import drop_partitions_before, upgrade_schema
+        from app.models import partitions
+        from app.repositories.polymer_repository import PolymerRepository
+        
+        engine = build_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        try:
+            upgrade_schema(engine)
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "INSERT INTO polymer_records (timestamp, polymer) VALUES "
+                    "('2023-06-10 08:00:00.000000', 'AaefxxxXB'), "
+                    "('2023-07-10 08:00:00.000000', 'abc'), "
+                    "('2023-07-10 08:01:00.000000', 'cba')"
+                ))
+            
+            def stored():
+                with Session(bind=engine) as session:
+                    records = PolymerRepository(session).get_by_time_range_with_filters(
+                        datetime(2023, 1, 1), datetime(2024, 1, 1), substring="efx", case_sensitive=False
+                    )
+                    all_records = PolymerRepository(session).get_all_polymers()
+                    return partitions.list_partitions(session), [r.polymer for r in records], len(all_records)
+            
+            monkeypatch.setattr(settings, "partitioned_storage", True)
+            upgrade_schema(engine)
+            assert stored() == (["polymer_records_202306", "polymer_records_202307"], ["AaefxxxXB"], 3)
+            
+            assert drop_partitions_before(engine, datetime(2023, 7, 10)) == ["polymer_records_202306"]
+            assert stored() == (["polymer_records_202307"], [], 2)
+            
+            monkeypatch.setattr(settings, "partitioned_storage", False)
+            upgrade_schema(engine)
+            assert stored() == ([], [], 2)
+        finally:
+            engine.dispose()
@@ -0,0 +1,83 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import MetricsRegistry, RequestMetrics, stage
+
+class TestMetricsRegistry:
+    def test_histogram_text_format(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(5.0, "/a")
+        counter = registry.counter("rows_total", "Rows.", ("endpoint",))
+        counter.inc(3, '/b"')
+
+        lines = registry.render().splitlines()
+
+        assert "# TYPE latency_seconds histogram" in lines
+        assert 'latency_seconds_bucket{endpoint="/a",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{endpoint="/a",le="1.0"} 2' in lines
+        assert 'latency_seconds_bucket{endpoint="/a",le="+Inf"} 3' in lines
+        assert 'latency_seconds_count{endpoint="/a"} 3' in lines
+        assert 'latency_seconds_sum{endpoint="/a"} 5.55' in lines
+        assert 'rows_total{endpoint="/b\\""} 3' in lines
+
+    def test_hooks_are_inert_outside_requests(self):
+        with stage("query"):
+            pass
+
+    def test_nested_stages_count_once(self):
+        @metrics.timed("query", count_rows=True)
+        def inner():
+            time.sleep(0.01)
+            return [1, 2]
+
+        @metrics.timed("query", count_rows=True)
+        def outer():
+            with stage("query"):
+                return inner() + [3]
+
+        current = RequestMetrics()
+        token = metrics._current.set(current)
+        started = time.perf_counter()
+        try:
+            outer()
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics._current.reset(token)
+
+        assert (list(current.stages), current.running, current.rows) == (["query"], set(), 3)
+        assert current.stages["query"] <= elapsed
+
+class TestMetricsEndpoint:
+    def test_reports_stages_per_endpoint(self, client: TestClient, auth_headers: dict):
+        test_data = [
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"},
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "cBAy"}
+        ]
+        client.post("/polymers", json=test_data, headers=auth_headers)
+        query = "start=2023-07-10T08:00:00&end=2023-07-10T08:01:00"
+        client.get(f"/reactor?{query}", headers=auth_headers)
+        client.get(f"/polymers?{query}", headers=auth_headers)
+        client.get("/no-such-path")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        for series in (
+            'polymer_stage_duration_seconds_count{endpoint="/polymers",stage="ingest"}',
+            'polymer_stage_duration_seconds_count{endpoint="/reactor",stage="query"}',
+            'polymer_stage_duration_seconds_count{endpoint="/reactor",stage="react"}',
+            'polymer_stage_duration_seconds_count{endpoint="/polymers",stage="serialize"}',
+            'polymer_http_request_duration_seconds_count{method="GET",endpoint="/reactor",status="200"}',
+            'polymer_http_request_duration_seconds_count{method="GET",endpoint="unmatched",status="404"}',
+            'polymer_http_response_size_bytes_count{endpoint="/reactor"}',
+        ):
+            assert series in body
+        assert 'polymer_monomers_reacted_total{endpoint="/reactor"}' in body
+        assert 'polymer_rows_fetched_total{endpoint="/polymers"}' in body
@@ -0,0 +1,81 @@
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.repositories.reactor_index import ReactorIndex
+from app.services.polymer_service import react_polymer
+
+BASE_TIME = datetime(2023, 7, 10, 8, 0, 0)
+
+def _record(offset, polymer):
+    return SimpleNamespace(
+        timestamp=BASE_TIME + timedelta(seconds=offset), polymer=polymer, reduced=None
+    )
+
+class TestReactorIndex:
+    def _build(self, polymers):
+        index = ReactorIndex()
+        index.load([])
+        for offset, polymer in polymers:
+            index.add(BASE_TIME + timedelta(seconds=offset), react_polymer(polymer))
+        return index
+
+    def test_query_matches_full_reaction(self):
+        rng = random.Random(7)
+        polymers = [
+            ''.join(rng.choice("aAbBcC") for _ in range(rng.randint(1, 12)))
+            for _ in range(40)
+        ]
+        index = self._build(enumerate(polymers))
+        
+        for _ in range(50):
+            low = rng.randint(0, 39)
+            high = rng.randint(low, 39)
+            expected = react_polymer(''.join(polymers[low:high + 1]))
+            result = index.query(
+                BASE_TIME + timedelta(seconds=low),
+                BASE_TIME + timedelta(seconds=high)
+            )
+            assert result == expected
+
+    def test_out_of_order_ingest(self):
+        index = self._build([(0, "ab"), (20, "Ad"), (10, "B")])
+        result = index.query(BASE_TIME, BASE_TIME + timedelta(seconds=30))
+        assert result == react_polymer("abBAd")
+
+    def test_empty_range(self):
+        index = self._build([(0, "ab")])
+        result = index.query(BASE_TIME + timedelta(hours=1), BASE_TIME + timedelta(hours=2))
+        assert result == ("", 0)
+
+    def test_load_keeps_records_ingested_while_reading(self):
+        index = ReactorIndex()
+        index.begin_load()
+        # Committed after the load read its records; the second is in both
+        index.on_ingest([_record(10, "B"), _record(0, "ab")])
+        index.load([_record(0, "ab"), _record(20, "Ad")])
+
+        result = index.query(BASE_TIME, BASE_TIME + timedelta(seconds=30))
+        assert result == react_polymer("abBAd")
+
+class TestReactorIndexEndpoint:
+    def test_reactor_uses_index(self, client: TestClient, auth_headers: dict, monkeypatch):
+        monkeypatch.setattr(settings, "reactor_index_enabled", True)
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"}
+        ], headers=auth_headers)
+        
+        url = "/reactor?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00"
+        assert client.get(url, headers=auth_headers).json()["result"] == "xabC"
+        
+        # Records ingested after the index is loaded are picked up
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "cBAy"}
+        ], headers=auth_headers)
+        
+        data = client.get(url, headers=auth_headers).json()
+        assert data["result"] == "xy"
+        assert data["reaction_count"] == 3
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.result_cache import RangeResultCache, make_key, result_cache
+
+JULY_10 = datetime(2023, 7, 10)
+JULY_11 = datetime(2023, 7, 11)
+JULY_12 = datetime(2023, 7, 12)
+
+class TestRangeResultCache:
+    def test_lru_eviction_by_size(self):
+        cache = RangeResultCache(max_bytes=10)
+        for name in ("a", "b", "c"):
+            cache.put(name, JULY_10, JULY_11, name, size=4, generation=cache.generation)
+        
+        assert cache.get("a") is None
+        assert cache.get("c") == "c"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size_bytes"] == 8
+
+    def test_invalidates_only_overlapping_ranges(self):
+        cache = RangeResultCache(max_bytes=100)
+        cache.put("early", JULY_10, JULY_11, 1, size=1, generation=cache.generation)
+        cache.put("late", JULY_11.replace(hour=1), JULY_12, 2, size=1, generation=cache.generation)
+        
+        cache.invalidate([datetime(2023, 7, 10, 12)])
+        
+        assert cache.get("early") is None
+        assert cache.get("late") == 2
+        assert cache.stats()["invalidations"] == 1
+
+    def test_rejects_results_older_than_an_ingest_in_range(self):
+        cache = RangeResultCache(max_bytes=100)
+        generation = cache.generation
+        cache.invalidate([datetime(2023, 7, 10, 12)])
+        
+        cache.put("stale", JULY_10, JULY_11, 1, size=1, generation=generation)
+        cache.put("fresh", JULY_11.replace(hour=1), JULY_12, 2, size=1, generation=generation)
+        
+        assert cache.get("stale") is None
+        assert cache.get("fresh") == 2
+
+    def test_keys_normalize_parameters(self):
+        assert make_key("polymers", JULY_10, JULY_11, b=1, a=2) == \
+            make_key("polymers", JULY_10, JULY_11, a=2, b=1)
+
+class TestResultCacheEndpoints:
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, monkeypatch):
+        monkeypatch.setattr(settings, "result_cache_max_bytes", 1_000_000)
+
+    def test_reactor_cached_until_ingest_in_range(self, client: TestClient, auth_headers: dict):
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "xabC"}
+        ], headers=auth_headers)
+        
+        url = "/reactor?start=2023-07-10T08:00:00&end=2023-07-10T08:01:00"
+        assert client.get(url, headers=auth_headers).json()["result"] == "xabC"
+        assert client.get(url, headers=auth_headers).json()["result"] == "xabC"
+        assert result_cache.hits == 1
+        
+        # Outside the cached range: still a hit
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T09:00:00.000", "polymer": "q"}
+        ], headers=auth_headers)
+        assert client.get(url, headers=auth_headers).json()["result"] == "xabC"
+        assert result_cache.hits == 2
+        
+        # Inside the cached range: recomputed
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:30.000", "polymer": "cBAy"}
+        ], headers=auth_headers)
+        assert client.get(url, headers=auth_headers).json()["result"] == "xy"
+        
+        stats = client.get("/cache/stats", headers=auth_headers).json()
+        assert stats["invalidations"] == 1
+        assert stats["hits"] == 2
+
+    def test_polymers_cached(self, client: TestClient, auth_headers: dict):
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:00:00.000", "polymer": "abc"}
+        ], headers=auth_headers)
+        
+        url = "/polymers?start=2023-07-10T08:00:00&end=2023-07-10T09:00:00"
+        first = client.get(url, headers=auth_headers).json()
+        assert client.get(url, headers=auth_headers).json() == first
+        assert result_cache.hits == 1
+        
+        client.post("/polymers", json=[
+            {"timestamp": "2023-07-10T08:30:00.000", "polymer": "def"}
+        ], headers=auth_headers)
+        assert len(client.get(url, headers=auth_headers).json()["polymers"]) == 2
@@ -1,5 +1,10 @@
+import random
+
 import pytest
-from app.services.polymer_service import react_polymer, will_react, process_multiple_polymers
+from app.services.vectorized_reactor import vectorized_available
+from app.services.polymer_service import (
+    react_polymer, will_react, process_multiple_polymers, merge_reduced, combine_segments
+)
 
 class TestPolymerService:
     def test_will_react(self):
@@ -45,4 +50,301 @@ class TestPolymerService:
     def test_process_empty_list(self):
         result, count = process_multiple_polymers([])
         assert result == ""
-        assert count == 0
\ No newline at end of file
+        assert count == 0
+
+    def test_merge_reduced_cancels_boundary(self):
+        result, count = merge_reduced("abC", "cBAd")
+        assert result == "d"
+        assert count == 3
+
+    def test_merge_reduced_no_boundary_reaction(self):
+        result, count = merge_reduced("ab", "cd")
+        assert result == "abcd"
+        assert count == 0
+
+    def test_combine_segments_matches_concatenated_reaction(self):
+        rng = random.Random(42)
+        polymers = [
+            ''.join(rng.choice("aAbBcC") for _ in range(rng.randint(1, 20)))
+            for _ in range(50)
+        ]
+        segments = [react_polymer(p) for p in polymers]
+        assert combine_segments(segments) == react_polymer(''.join(polymers))
+
+    def test_combine_empty_segments(self):
+        assert combine_segments([]) == ("", 0)
+
+    def test_reaction_state_streams_same_result(self):
+        from app.services.polymer_service import ReactionState
+        
+        state = ReactionState()
+        state.feed("xabC")
+        state.feed_segment(*react_polymer("cBAyAaefxxxXB"))
+        
+        assert ''.join(state.iter_result(chunk_size=2)) == "xyefxxB"
+        assert state.reaction_count == react_polymer("xabCcBAyAaefxxxXB")[1]
+
+class TestSlidingWindows:
+    def test_matches_independent_reactions(self):
+        from datetime import datetime, timedelta
+        from app.services.polymer_service import react_sliding_windows
+        
+        rng = random.Random(9)
+        base = datetime(2023, 7, 10)
+        polymers = [''.join(rng.choice("aAbBcC") for _ in range(rng.randint(1, 10))) for _ in range(60)]
+        entries = [
+            (base + timedelta(seconds=i * 10), react_polymer(polymer))
+            for i, polymer in enumerate(polymers)
+        ]
+        
+        results = react_sliding_windows(
+            entries, base, base + timedelta(minutes=10), timedelta(seconds=95), timedelta(seconds=25)
+        )
+        
+        assert len(results) == 21
+        for window_start, window_end, result, count in results:
+            in_window = [
+                polymer for i, polymer in enumerate(polymers)
+                if window_start <= base + timedelta(seconds=i * 10) <= window_end
+            ]
+            assert (result, count) == react_polymer(''.join(in_window))
+    
+    def test_memory_grows_with_records_not_records_times_window(self):
+        import tracemalloc
+        from datetime import datetime, timedelta
+        from app.services.polymer_service import react_sliding_windows
+        
+        rng = random.Random(3)
+        base = datetime(2023, 7, 10)
+        # 2,000 stable 60-letter records: the window's polymer is 120 KB
+        entries = [
+            (base + timedelta(seconds=i), react_polymer(''.join(rng.choice("abcdef") for _ in range(60))))
+            for i in range(2000)
+        ]
+        segment_bytes = sum(len(segment[0]) for _, segment in entries)
+        
+        tracemalloc.start()
+        try:
+            results = react_sliding_windows(
+                entries, base, base + timedelta(seconds=2010), timedelta(seconds=2000), timedelta(seconds=5)
+            )
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        
+        assert [len(result) for _, _, result, _ in results] == [120_000, 119_700, 119_400]
+        # Suffix combinations that each copied the rest of the window took
+        # about a thousand times the segments' size here
+        assert peak < 20 * segment_bytes
+
+class TestReactionCounter:
+    def test_counts_match_full_reaction(self):
+        from collections import Counter
+        from app.services.polymer_service import ReactionCounter
+        
+        rng = random.Random(5)
+        polymers = [''.join(rng.choice("aAbBcC") for _ in range(30)) for _ in range(20)]
+        counter = ReactionCounter()
+        for i, polymer in enumerate(polymers):
+            if i % 2:
+                counter.feed(polymer)
+            else:
+                counter.feed_segment(*react_polymer(polymer))
+        
+        result, count = react_polymer(''.join(polymers))
+        assert counter.reaction_count == count
+        assert counter.length == len(result)
+        assert counter.composition() == dict(sorted(Counter(result).items()))
+
+    def test_switches_to_characters_for_non_ascii(self):
+        from app.services.polymer_service import ReactionCounter
+        
+        counter = ReactionCounter()
+        counter.feed("abé")
+        counter.feed_segment("ÉBc", 0)
+        assert counter.reaction_count == 2
+        assert counter.composition() == {"a": 1, "c": 1}
+
+class TestVectorizedReactor:
+    @pytest.fixture(autouse=True)
+    def require_numpy(self):
+        pytest.importorskip("numpy")
+
+    def test_matches_stack_reaction(self):
+        from app.services.vectorized_reactor import react_polymer_vectorized
+        
+        rng = random.Random(3)
+        for alphabet in ("aA", "aAbBcC", "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"):
+            polymer = ''.join(rng.choice(alphabet) for _ in range(5000))
+            assert react_polymer_vectorized(polymer) == react_polymer(polymer)
+
+    def test_overlapping_and_nested_pairs(self):
+        from app.services.vectorized_reactor import react_polymer_vectorized
+        
+        assert react_polymer_vectorized("aAaAa") == ("a", 2)
+        assert react_polymer_vectorized("abcdeEDCBA") == ("", 5)
+        assert react_polymer_vectorized("AaefxxxXB") == ("efxxB", 2)
+        assert react_polymer_vectorized("@`") == ("@`", 0)
+
+    def test_auto_selected_above_threshold(self, monkeypatch):
+        from app.core.config import settings
+        from app.services import polymer_service
+        
+        calls = []
+        original = polymer_service.react_polymer_vectorized
+        monkeypatch.setattr(settings, "vectorized_reaction_threshold", 4)
+        monkeypatch.setattr(
+            polymer_service, "react_polymer_vectorized",
+            lambda polymer, partners: calls.append(polymer) or original(polymer, partners)
+        )
+        
+        assert react_polymer("vRaKkNgeUYTt") == ("vRaNgeUY", 2)
+        assert react_polymer("aA") == ("", 1)
+        assert calls == ["vRaKkNgeUYTt"]
+
+    def test_used_for_windows_with_custom_rules(self, monkeypatch):
+        from types import SimpleNamespace
+        
+        from app.core.config import settings
+        from app.services import polymer_service
+        from app.services.reaction_rules import get_rules
+        
+        rules = get_rules("polarity;inert=xX")
+        rng = random.Random(4)
+        polymers = [''.join(rng.choice("aAbBxX") for _ in range(rng.randint(1, 40))) for _ in range(300)]
+        records = [SimpleNamespace(polymer=polymer, reduced=None) for polymer in polymers]
+        expected = combine_segments([react_polymer(polymer, rules) for polymer in polymers], rules=rules)
+        
+        calls = []
+        original = polymer_service.react_polymer_vectorized
+        monkeypatch.setattr(settings, "vectorized_reaction_threshold", 1000)
+        monkeypatch.setattr(
+            polymer_service, "react_polymer_vectorized",
+            lambda polymer, partners: calls.append(polymer) or original(polymer, partners)
+        )
+        
+        assert polymer_service.react_records(records, rules) == expected
+        assert calls == [''.join(polymers)]
+
+class TestPolymerCodec:
+    def test_pack_round_trip(self):
+        from app.services.polymer_codec import pack, unpack
+        
+        rng = random.Random(5)
+        letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        for length in range(0, 20):
+            polymer = ''.join(rng.choice(letters) for _ in range(length))
+            packed = pack(polymer)
+            assert len(packed) == -(-length // 4) * 3
+            assert unpack(packed) == polymer
+            assert unpack(memoryview(packed)) == polymer
+
+    def test_reaction_on_codes_matches_stack_reaction(self):
+        from app.services.polymer_codec import decode_codes, encode_codes, react_codes
+        
+        rng = random.Random(6)
+        polymers = [''.join(rng.choice("aAbBcCzZ") for _ in range(rng.randint(1, 40))) for _ in range(50)]
+        for polymer in polymers:
+            codes, count = react_codes(encode_codes(polymer))
+            assert (decode_codes(codes), count) == react_polymer(polymer)
+
+    def test_reaction_on_codes_follows_rules(self):
+        from app.services.polymer_codec import decode_codes, encode_codes, react_codes
+        from app.services.reaction_rules import get_rules
+        
+        rules = get_rules("polarity;inert=cC;pairs=ab,Zy")
+        rng = random.Random(7)
+        polymers = [''.join(rng.choice("aAbBcCyZ") for _ in range(rng.randint(1, 40))) for _ in range(50)]
+        for polymer in polymers:
+            codes, count = react_codes(encode_codes(polymer), rules)
+            assert (decode_codes(codes), count) == react_polymer(polymer, rules)
+
+class TestReactionRules:
+    CUSTOM = "polarity;inert=cC;pairs=ab,dd"
+    
+    def naive_reaction(self, polymer, rules):
+        # Remove the leftmost reacting pair until none are left
+        count = 0
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(polymer) - 1):
+                if rules.reacts(polymer[i], polymer[i + 1]):
+                    polymer = polymer[:i] + polymer[i + 2:]
+                    count += 1
+                    changed = True
+                    break
+        return polymer, count
+    
+    def test_compiled_partners(self):
+        from app.services.reaction_rules import get_rules
+        
+        rules = get_rules(self.CUSTOM)
+        assert rules.partners["a"] == "b" and rules.partners["b"] == "a"
+        assert rules.partners["A"] is None and rules.partners["B"] is None
+        assert rules.partners["c"] is None and rules.partners["C"] is None
+        assert rules.partners["d"] == "d" and rules.partners["D"] is None
+        assert rules.partners["e"] == "E"
+        assert rules.byte_partners[ord("a")] == ord("b")
+        assert get_rules(self.CUSTOM) is rules
+        assert get_rules("polarity").canonical and not rules.canonical
+        assert will_react("x", "y", get_rules("polarity;pairs=xy"))
+        assert not will_react("x", "X", get_rules("none"))
+    
+    def test_invalid_specs(self):
+        from app.services.reaction_rules import get_rules
+        
+        for spec in ("", "inert=a", "polarity;pairs=abc", "polarity;inert=1", "polarity;flip"):
+            with pytest.raises(ValueError):
+                get_rules(spec)
+    
+    def test_engines_agree_under_custom_rules(self, monkeypatch):
+        from app.core.config import settings
+        from app.services.polymer_service import ReactionCounter, ReactionState
+        from app.services.reaction_rules import get_rules
+        
+        rules = get_rules(self.CUSTOM)
+        rng = random.Random(8)
+        polymers = [''.join(rng.choice("aAbBcCdDeE") for _ in range(rng.randint(1, 12))) for _ in range(40)]
+        expected = self.naive_reaction(''.join(polymers), rules)
+        
+        assert react_polymer(''.join(polymers), rules) == expected
+        segments = [react_polymer(polymer, rules) for polymer in polymers]
+        assert combine_segments(segments, rules=rules) == expected
+        
+        state = ReactionState(rules)
+        counter = ReactionCounter(rules)
+        for polymer in polymers:
+            state.feed(polymer)
+            counter.feed(polymer)
+        assert (''.join(state.stack), state.reaction_count) == expected
+        assert (counter.length, counter.reaction_count) == (len(expected[0]), expected[1])
+        
+        if vectorized_available():
+            monkeypatch.setattr(settings, "vectorized_reaction_threshold", 1)
+            assert react_polymer(''.join(polymers), rules) == expected
+
+class TestParallelReaction:
+    @pytest.fixture(autouse=True)
+    def two_workers(self, monkeypatch):
+        from app.core.config import settings
+        from app.services.polymer_service import shutdown_reaction_pool
+        
+        monkeypatch.setattr(settings, "reactor_workers", 2)
+        yield
+        shutdown_reaction_pool()
+
+    def test_parallel_matches_serial(self):
+        rng = random.Random(11)
+        polymers = [
+            ''.join(rng.choice("aAbBcCdD") for _ in range(rng.randint(1, 128)))
+            for _ in range(200)
+        ]
+        expected = process_multiple_polymers(polymers)
+        assert process_multiple_polymers(polymers, parallel=True) == expected
+        
+        segments = [react_polymer(p) for p in polymers]
+        assert combine_segments(segments, parallel=True) == expected
+
+    def test_parallel_cancels_across_chunks(self):
+        assert process_multiple_polymers(["abc", "CBA"], parallel=True) == ("", 3)
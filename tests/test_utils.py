@@ -0,0 +1,39 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.schemas import PolymerList
+from app.utils import serialization
+from app.utils.cursors import decode_cursor, encode_cursor
+from app.utils.serialization import encode_polymer_list
+
+ROWS = [
+    SimpleNamespace(timestamp=datetime(2023, 7, 10, 8, 0, 21, 123000), polymer="aBc"),
+    SimpleNamespace(timestamp=datetime(2023, 7, 10, 8, 1), polymer="def"),
+]
+
+class TestSerialization:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_matches_pydantic_output(self, use_orjson, monkeypatch):
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(serialization, "orjson", None)
+        
+        expected = PolymerList(
+            polymers=[{"timestamp": r.timestamp, "polymer": r.polymer} for r in ROWS],
+            next_cursor="abc"
+        ).model_dump_json()
+        
+        assert json.loads(encode_polymer_list(ROWS, "abc")) == json.loads(expected)
+
+class TestCursors:
+    def test_round_trip(self):
+        timestamp = datetime(2023, 7, 10, 8, 0, 21, 123000)
+        assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")